@@ -0,0 +1,153 @@
+"""Benchmark record conformance and validation of the issues stream.
+
+Compares the records per second of the SDK's type conformance, which is what
+the tap used before, with the compiled conformer and the validation modes.
+
+Usage:
+
+    poetry run python benchmarks/records.py --records 2000 --histories 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import logging
+import time
+import typing as t
+
+from jsonschema import validate
+from singer_sdk.helpers._typing import TypeConformanceLevel, conform_record_data_types
+
+from tap_jira.tap import TapJira
+from tap_jira.validation import RecordConformer, RecordValidator
+
+CONFIG = {
+    "username": "benchmark@example.org",
+    "api_key": "benchmark",
+    "domain": "benchmark.atlassian.net",
+    "custom_fields": {f"customfield_{10000 + i}": f"custom_{i}" for i in range(20)},
+}
+
+LOGGER = logging.getLogger("benchmark")
+LOGGER.addHandler(logging.NullHandler())
+LOGGER.propagate = False
+
+
+def make_issue(index: int, histories: int) -> dict:
+    """Return a post-processed issue with the given number of changelog histories."""
+    user = {
+        "accountId": "5b10a2844c20165700ede21g",
+        "displayName": "Mia",
+        "active": True,
+    }
+    status = {
+        "id": "3",
+        "name": "In Progress",
+        "statusCategory": {"id": 4, "key": "indeterminate", "name": "In Progress"},
+    }
+    issue_type = {"id": "10001", "name": "Story", "subtask": False, "hierarchyLevel": 0}
+    return {
+        "id": str(index),
+        "key": f"EX-{index}",
+        "updated": "2021-01-19T23:45:00.000+0000",
+        "sprint_id": 1,
+        "changelog": {
+            "histories": [
+                {
+                    "id": str(history),
+                    "issueId": str(index),
+                    "created": "2021-01-19T23:45:00.000+0000",
+                    "author": user,
+                    "items": [
+                        {
+                            "field": "status",
+                            "fieldtype": "jira",
+                            "from": "1",
+                            "fromString": "To Do",
+                            "to": "3",
+                            "toString": "In Progress",
+                        },
+                    ],
+                }
+                for history in range(histories)
+            ],
+        },
+        "fields": {
+            "summary": "Main order flow broken",
+            "project": {"id": "10000", "key": "EX", "name": "Example"},
+            "status": status,
+            "assignee": user,
+            "issuetype": issue_type,
+            "parent": {
+                "id": "1",
+                "key": "EX-1",
+                "fields": {
+                    "summary": "Epic",
+                    "issuetype": issue_type,
+                    "status": status,
+                },
+            },
+            "created": "2021-01-17T12:34:00.000+0000",
+            "labels": ["backend", "orders"],
+            **{name: f"value {name}" for name in CONFIG["custom_fields"].values()},
+        },
+    }
+
+
+def measure(name: str, records: list[dict], process: t.Callable[[dict], t.Any]) -> None:
+    """Print the records per second of processing copies of the records."""
+    records = copy.deepcopy(records)
+    started = time.perf_counter()
+    for record in records:
+        process(record)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<45} {len(records) / elapsed:>10,.0f} records/s")  # noqa: T201
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--histories", type=int, default=100)
+    args = parser.parse_args()
+
+    stream = TapJira(config=CONFIG, parse_env_config=False).streams["issues"]
+    schema = stream.schema
+    records = [make_issue(index, args.histories) for index in range(args.records)]
+
+    conformer = RecordConformer(stream.name, schema, LOGGER)
+    full = RecordValidator(stream.name, schema, LOGGER, mode="full")
+    sample = RecordValidator(stream.name, schema, LOGGER, mode="sample")
+
+    measure(
+        "SDK conformance (previous path)",
+        records,
+        lambda record: conform_record_data_types(
+            stream_name=stream.name,
+            record=record,
+            schema=stream.schema,
+            level=TypeConformanceLevel.RECURSIVE,
+            logger=LOGGER,
+        ),
+    )
+    measure("compiled conformance", records, conformer.conform)
+    measure(
+        "compiled conformance + sampled validation",
+        records,
+        lambda record: sample.validate(conformer.conform(record)),
+    )
+    measure(
+        "compiled conformance + full validation",
+        records,
+        lambda record: full.validate(conformer.conform(record)),
+    )
+    measure(
+        "jsonschema.validate per record (uncompiled)",
+        records[: max(1, len(records) // 10)],
+        lambda record: validate(record, schema),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""A small least-recently-used cache."""
+
+from __future__ import annotations
+
+import typing as t
+from collections import OrderedDict
+
+_K = t.TypeVar("_K")
+_V = t.TypeVar("_V")
+
+
+class LRUCache(t.Generic[_K, _V]):
+    """Mapping that evicts the least recently used entry once it is full."""
+
+    def __init__(self, maxsize: int) -> None:
+        """Create a new cache.
+
+        Args:
+            maxsize: The maximum number of entries to keep.
+        """
+        self.maxsize = maxsize
+        self._data: OrderedDict[_K, _V] = OrderedDict()
+
+    def __contains__(self, key: object) -> bool:
+        """Return whether the key is cached, without marking it as used."""
+        return key in self._data
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._data)
+
+    def get(self, key: _K, default: _V | None = None) -> _V | None:
+        """Return a cached value and mark it as recently used.
+
+        Args:
+            key: The key to look up.
+            default: The value to return if the key is not cached.
+
+        Returns:
+            The cached value, or the default.
+        """
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def __setitem__(self, key: _K, value: _V) -> None:
+        """Cache a value, evicting the least recently used entries if needed."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
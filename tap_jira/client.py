@@ -2,22 +2,103 @@
 
 from __future__ import annotations
 
+import json
+from collections import deque
 from pathlib import Path
-from typing import Any, Callable, Iterable
+from http import HTTPStatus
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+)
 
 import requests
+import singer_sdk._singerlib as singer
+from singer_sdk import metrics
 from singer_sdk.authenticators import BasicAuthenticator
+from singer_sdk.batch import JSONLinesBatcher
+from singer_sdk.exceptions import RetriableAPIError
+from singer_sdk.helpers._catalog import pop_deselected_record_properties
+from singer_sdk.helpers._typing import TypeConformanceLevel, conform_record_data_types
+from singer_sdk.helpers._util import utc_now
+from singer_sdk.helpers.jsonpath import extract_jsonpath
 
 from singer_sdk.streams import RESTStream
 
+from tap_jira.paginators import PageSizeController, PrefetchPaginator, decode_json
+from tap_jira.pruning import DEFAULT_PRUNE_PATHS, RecordPruner
+from tap_jira.recording import RecordingTransport, ReplayTransport
+from tap_jira.transport import LatencyTracker, SerialTransport, get_transport
+from tap_jira.validation import RecordConformer, RecordValidator
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from backoff.types import Details
+    from singer_sdk.helpers._batch import BaseBatchFileEncoding, BatchConfig
+
 _Auth = Callable[[requests.PreparedRequest], requests.PreparedRequest]
 SCHEMAS_DIR = Path(__file__).parent / Path("./schemas")
 
+#: Streams written to batch files when `batch_config` is set.
+DEFAULT_BATCH_STREAMS = ("issues",)
+
 
 class JiraStream(RESTStream):
     """Jira stream class."""
 
     _page_size = 100
+    #: The largest page size to request with `adaptive_page_size`, for endpoints
+    #: that do not report the page size they applied. A silent server cap would
+    #: otherwise go unnoticed, and the records past it would be skipped.
+    _max_page_size: int | None = None
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the stream."""
+        super().__init__(*args, **kwargs)
+        self._transport: SerialTransport | None = None
+        self._prefetched: dict[
+            tuple[str, int],
+            tuple[requests.PreparedRequest, Future],
+        ] = {}
+        self.pruner = RecordPruner(self.config.get("prune_paths", DEFAULT_PRUNE_PATHS))
+        self.page_size_controller: PageSizeController | None = None
+        if self.config.get("adaptive_page_size"):
+            max_page_size = self.config.get("max_page_size", 1000)
+            if self._max_page_size is not None:
+                max_page_size = min(max_page_size, self._max_page_size)
+            self.page_size_controller = PageSizeController(
+                self._page_size,
+                max_page_size=max_page_size,
+                target_latency=self.config.get("page_latency_target", 5.0),
+            )
+        self._page_size_cap: int | None = None
+        self._record_conformer: RecordConformer | None = None
+        self._record_validator: RecordValidator | None = None
+        self._conform_schema: dict = {}
+        self.request_deadline: float | None = self.config.get(
+            "request_deadlines",
+            {},
+        ).get(self.name)
+        self.latency_tracker: LatencyTracker | None = None
+        if self.config.get("hedge_requests"):
+            self.latency_tracker = LatencyTracker(
+                percentile=self.config.get("hedge_percentile", 95),
+            )
+
+    @property
+    def page_size(self) -> int:
+        """Return the page size for the next request."""
+        page_size = self._page_size
+        if self.page_size_controller:
+            page_size = self.page_size_controller.page_size
+        if self._page_size_cap:
+            return min(page_size, self._page_size_cap)
+        return page_size
 
     @property
     def url_base(self) -> str:
@@ -73,8 +154,475 @@ class JiraStream(RESTStream):
         params: dict = {}
         if next_page_token:
             params["startAt"] = next_page_token
-        params["maxResults"] = self._page_size
+        params["maxResults"] = self.page_size
         if self.replication_key:
             params["sort"] = "asc"
             params["order_by"] = self.replication_key
         return params
+
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        """Parse the response and return an iterator of result records.
+
+        Args:
+            response: The HTTP ``requests.Response`` object.
+
+        Yields:
+            Each record from the source.
+        """
+        yield from extract_jsonpath(self.records_jsonpath, input=decode_json(response))
+
+    def post_process(
+        self,
+        row: dict,
+        context: dict | None = None,  # noqa: ARG002
+    ) -> dict | None:
+        """Drop the properties matching `prune_paths` from the record.
+
+        Args:
+            row: An individual record from the stream.
+            context: The stream context.
+
+        Returns:
+            The pruned record.
+        """
+        return self.pruner.prune(row)
+
+    def get_batch_config(self, config: Mapping) -> BatchConfig | None:
+        """Return the batch config, for the streams listed in `batch_streams` only.
+
+        Args:
+            config: Tap configuration dictionary.
+
+        Returns:
+            Batch config for this stream, or ``None`` to emit RECORD messages.
+        """
+        if self.name not in config.get("batch_streams", DEFAULT_BATCH_STREAMS):
+            return None
+        return super().get_batch_config(config)
+
+    def get_batches(
+        self,
+        batch_config: BatchConfig,
+        context: dict | None = None,
+    ) -> Iterable[tuple[BaseBatchFileEncoding, list[str]]]:
+        """Write records to gzip compressed JSONL files, one file per batch.
+
+        Batches do not span contexts, e.g. the issues of each board get files of
+        their own, so the bookmark of a context is only emitted once its records
+        are announced. Records are conformed to the schema the same way as
+        RECORD messages, so targets get the same data whichever way it is
+        delivered.
+
+        Args:
+            batch_config: Batch config for this stream.
+            context: The stream context.
+
+        Yields:
+            A tuple of (encoding, manifest) for each batch.
+        """
+        batcher = JSONLinesBatcher(
+            tap_name=self.tap_name,
+            stream_name=self.name,
+            batch_config=batch_config,
+        )
+        records = (
+            self._conform_record(record)
+            for record in self._sync_records(context, write_messages=False)
+        )
+        for manifest in batcher.get_batches(records=records):
+            yield batch_config.encoding, manifest
+
+    def _conform_record(self, record: dict) -> dict:
+        """Conform a record with the schema compiled for this stream, and validate it.
+
+        Args:
+            record: The record to conform.
+
+        Returns:
+            The conformed record.
+        """
+        if self._record_conformer is None or self._record_validator is None:
+            schema = self.schema
+            self._record_conformer = RecordConformer(self.name, schema, self.logger)
+            self._record_validator = RecordValidator(
+                self.name,
+                schema,
+                self.logger,
+                mode=self.config.get("record_validation", "none"),
+                sample_rate=self.config.get("validation_sample_rate", 100),
+            )
+            self._conform_schema = schema
+
+        pop_deselected_record_properties(
+            record,
+            self._conform_schema,
+            self.mask,
+            self.logger,
+        )
+        if self.TYPE_CONFORMANCE_LEVEL == TypeConformanceLevel.RECURSIVE:
+            record = self._record_conformer.conform(record)
+        else:
+            record = conform_record_data_types(
+                stream_name=self.name,
+                record=record,
+                schema=self._conform_schema,
+                level=self.TYPE_CONFORMANCE_LEVEL,
+                logger=self.logger,
+            )
+        self._record_validator.validate(record)
+        return record
+
+    def _sync_records(
+        self,
+        context: dict | None = None,
+        *,
+        write_messages: bool = True,
+    ) -> Generator[dict, Any, Any]:
+        """Sync records, closing the transports once a top-level sync is done.
+
+        Child streams are synced once per parent record, so their transports
+        are kept open until the sync of the top-level stream ends.
+
+        Args:
+            context: Stream partition or context dictionary.
+            write_messages: Whether to write Singer messages to stdout.
+
+        Yields:
+            Each record from the source.
+        """
+        try:
+            yield from super()._sync_records(context, write_messages=write_messages)
+        finally:
+            if context is None:
+                self.close_transports()
+
+    def close_transports(self) -> None:
+        """Close the transports of this stream and its child streams."""
+        for key in list(self._prefetched):
+            self._discard(key)
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        for child in self.child_streams:
+            if isinstance(child, JiraStream):
+                child.close_transports()
+
+    def _generate_record_messages(
+        self,
+        record: dict,
+    ) -> Generator[singer.RecordMessage, None, None]:
+        """Generate RECORD messages, conforming with the compiled schema.
+
+        Args:
+            record: A single stream record.
+
+        Yields:
+            Record message objects.
+        """
+        record = self._conform_record(record)
+        for stream_map in self.stream_maps:
+            mapped_record = stream_map.transform(record)
+            # Emit record if not filtered
+            if mapped_record is not None:
+                yield singer.RecordMessage(
+                    stream=stream_map.stream_alias,
+                    record=mapped_record,
+                    version=None,
+                    time_extracted=utc_now(),
+                )
+
+    @property
+    def transport(self) -> SerialTransport:
+        """Return the HTTP transport selected with the `http_transport` setting.
+
+        With `http_archive_mode` set to ``record`` the responses are recorded to
+        `http_archive`, with ``replay`` they are served from it instead.
+
+        Raises:
+            ValueError: If an archive mode is set without `http_archive`.
+        """
+        if self._transport is None:
+            name = self.config.get("http_transport", "serial")
+            mode = self.config.get("http_archive_mode", "off")
+            if mode != "off" and not self.config.get("http_archive"):
+                msg = f"http_archive is required when http_archive_mode is '{mode}'"
+                raise ValueError(msg)
+            if mode == "replay":
+                self._transport = ReplayTransport(
+                    self.config["http_archive"],
+                    concurrent=name != "serial",
+                )
+                return self._transport
+
+            self._transport = get_transport(
+                name,
+                session=self.requests_session,
+                timeout=self.timeout,
+                max_concurrency=self.config.get("max_concurrent_requests", 10),
+            )
+            if mode == "record":
+                self._transport = RecordingTransport(
+                    self._transport,
+                    self.config["http_archive"],
+                    redact=self.config.get("http_archive_redact_pii", False),
+                    domain=self.config.get("domain"),
+                )
+        return self._transport
+
+    def _request(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,
+    ) -> requests.Response:
+        """Send a request through the configured transport and validate it.
+
+        Args:
+            prepared_request: The prepared request.
+            context: The stream context.
+
+        Returns:
+            The validated response.
+        """
+        return self._handle_response(
+            prepared_request,
+            self._send(prepared_request),
+            context,
+        )
+
+    def _handle_response(
+        self,
+        prepared_request: requests.PreparedRequest,
+        response: requests.Response,
+        context: dict | None,
+    ) -> requests.Response:
+        """Record the latency of a response and validate it.
+
+        Args:
+            prepared_request: The prepared request.
+            response: The response to the request.
+            context: The stream context.
+
+        Returns:
+            The validated response.
+        """
+        if self.latency_tracker and prepared_request.method == "GET":
+            self.latency_tracker.observe(response.elapsed.total_seconds())
+        self._write_request_duration_log(
+            endpoint=self.path,
+            response=response,
+            context=context,
+            extra_tags={"url": prepared_request.path_url}
+            if self._LOG_REQUEST_METRIC_URLS
+            else None,
+        )
+        self.validate_response(response)
+        return response
+
+    def _send(self, prepared_request: requests.PreparedRequest) -> requests.Response:
+        """Send a request, hedged and bounded by the stream deadline if it is a GET.
+
+        Only GET requests are hedged or abandoned at the deadline, since they
+        can safely be sent more than once.
+
+        Args:
+            prepared_request: The prepared request.
+
+        Returns:
+            The response.
+        """
+        return self.transport.send_hedged(
+            prepared_request,
+            **self._hedging(prepared_request),
+        )
+
+    def _hedging(
+        self,
+        prepared_request: requests.PreparedRequest,
+    ) -> dict[str, float | None]:
+        """Return the hedging and deadline arguments for a request.
+
+        Args:
+            prepared_request: The prepared request.
+
+        Returns:
+            Keyword arguments for `SerialTransport.send_hedged` and `submit`.
+        """
+        if prepared_request.method != "GET":
+            return {}
+        return {
+            "hedge_after": self.latency_tracker.threshold()
+            if self.latency_tracker
+            else None,
+            "deadline": self.request_deadline,
+        }
+
+    def prefetch(self, contexts: list[dict]) -> None:
+        """Start fetching the first page for each context in the background.
+
+        The responses are kept until the stream requests the same page, so a
+        parent stream can fan out child requests while records are still
+        emitted one context at a time. Responses left over from an earlier
+        batch are discarded.
+
+        Args:
+            contexts: The stream contexts to prefetch.
+        """
+        for key in list(self._prefetched):
+            self._discard(key)
+        if not self.transport.concurrent or not contexts:
+            return
+        for context in contexts:
+            # The first page of incremental streams depends on the bookmark.
+            self._write_starting_replication_value(context)
+            self._prefetch(context, 0)
+
+    def _prefetch_key(
+        self,
+        context: dict | None,
+        offset: int | None,
+    ) -> tuple[str, int]:
+        # By offset rather than URL, the page size may change in between.
+        return json.dumps(context, sort_keys=True, default=str), offset or 0
+
+    def _prefetch(self, context: dict | None, offset: int) -> None:
+        prepared_request = self.prepare_request(context, next_page_token=offset)
+        self._prefetched[self._prefetch_key(context, offset)] = (
+            prepared_request,
+            self.transport.submit(prepared_request, **self._hedging(prepared_request)),
+        )
+
+    def _discard(self, key: tuple[str, int]) -> None:
+        prefetched = self._prefetched.pop(key, None)
+        if prefetched is not None:
+            prefetched[1].cancel()
+
+    def request_records(self, context: dict | None) -> Iterable[dict]:
+        """Request records from the API, prefetching pages where possible.
+
+        When the transport is concurrent and the paginator can tell which pages
+        follow the first response, up to `max_concurrent_requests` of those
+        pages are kept in flight ahead of the page being parsed. Records are
+        still yielded in page order.
+
+        Prefetched pages are requested at the page size the first page was
+        served with, and later pages are never requested larger than that, so
+        their offsets line up with the pages the stream asks for.
+
+        Requests are prepared again when they are retried, so a page size that
+        was reduced after a timeout or a server error applies to the retry.
+
+        Args:
+            context: The stream context.
+
+        Yields:
+            An item for every record in the response.
+        """
+        paginator = self.get_new_paginator()
+        decorated_request = self.request_decorator(self._request_page)
+        prefetcher = (
+            paginator
+            if self.transport.concurrent and isinstance(paginator, PrefetchPaginator)
+            else None
+        )
+        remaining: Iterator[int] | None = None
+        window: deque[int] = deque()
+
+        with metrics.http_request_counter(self.name, self.path) as request_counter:
+            request_counter.context = context
+
+            try:
+                while not paginator.finished:
+                    prepared_request, resp = decorated_request(
+                        context,
+                        paginator.current_value,
+                    )
+                    request_counter.increment()
+                    self.update_sync_costs(prepared_request, resp, context)
+                    records = self.parse_response(resp)
+
+                    paginator.advance(resp)
+
+                    if prefetcher is not None and not paginator.finished:
+                        if remaining is None:
+                            self._page_size_cap = prefetcher.get_page_size(resp)
+                            remaining = iter(prefetcher.get_remaining_values(resp))
+                        self._fill_window(
+                            context,
+                            paginator.current_value,
+                            remaining,
+                            window,
+                        )
+                    yield from records
+            finally:
+                self._page_size_cap = None
+                for offset in window:
+                    self._discard(self._prefetch_key(context, offset))
+
+    def _fill_window(
+        self,
+        context: dict | None,
+        position: int,
+        remaining: Iterator[int],
+        window: deque[int],
+    ) -> None:
+        """Keep up to `max_concurrent_requests` pages in flight ahead of `position`.
+
+        Args:
+            context: The stream context.
+            position: The offset of the next page the stream requests.
+            remaining: The offsets of the pages not prefetched yet.
+            window: The offsets of the pages prefetched so far.
+        """
+        # Pages before the position were either requested or skipped.
+        while window and window[0] < position:
+            self._discard(self._prefetch_key(context, window.popleft()))
+        size = self.config.get("max_concurrent_requests", 10)
+        while len(window) < size:
+            offset = next(remaining, None)
+            if offset is None:
+                break
+            self._prefetch(context, offset)
+            window.append(offset)
+
+    def _request_page(
+        self,
+        context: dict | None,
+        next_page_token: Any | None,  # noqa: ANN401
+    ) -> tuple[requests.PreparedRequest, requests.Response]:
+        prefetched = self._prefetched.pop(
+            self._prefetch_key(context, next_page_token),
+            None,
+        )
+        if prefetched is not None:
+            prepared_request, future = prefetched
+            if future.exception() is None:
+                response = future.result()
+                return prepared_request, self._handle_response(
+                    prepared_request,
+                    response,
+                    context,
+                )
+        # Failed prefetches are sent again, with the usual retries.
+        prepared_request = self.prepare_request(
+            context,
+            next_page_token=next_page_token,
+        )
+        return prepared_request, self._request(prepared_request, context)
+
+    def backoff_handler(self, details: Details) -> None:
+        """Reduce the page size after a timeout or server error, then log.
+
+        Args:
+            details: backoff invocation details
+        """
+        exception = details.get("exception")
+        if self.page_size_controller and (
+            isinstance(exception, requests.exceptions.Timeout)
+            or (
+                isinstance(exception, RetriableAPIError)
+                and exception.response is not None
+                and exception.response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+            )
+        ):
+            self.page_size_controller.shrink()
+        super().backoff_handler(details)
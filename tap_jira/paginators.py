@@ -1,41 +1,219 @@
 from __future__ import annotations
 
+import itertools
+import typing as t
+from urllib.parse import parse_qs, urlparse
+
 from requests import Response
 from singer_sdk.helpers.jsonpath import extract_jsonpath
 from singer_sdk.pagination import BaseOffsetPaginator
 
 
-class JiraPaginator(BaseOffsetPaginator):
+def decode_json(response: Response) -> t.Any:  # noqa: ANN401
+    """Return the decoded JSON body of a response, decoding it only once.
+
+    Pagination, page size control and record parsing all read the body, so
+    the decoded body is kept on the response.
+    """
+    attributes = vars(response)
+    if "_decoded_json" not in attributes:
+        attributes["_decoded_json"] = response.json()
+    return attributes["_decoded_json"]
+
+
+def requested_page_size(response: Response) -> int | None:
+    """Return the `maxResults` that was sent with the request of a response."""
+    if response.request is None or response.request.url is None:
+        return None
+    values = parse_qs(urlparse(response.request.url).query).get("maxResults")
+    return int(values[0]) if values else None
+
+
+@t.runtime_checkable
+class PrefetchPaginator(t.Protocol):
+    """A paginator that knows the offsets of the pages after a response."""
+
+    def get_page_size(self, response: Response) -> int:
+        """Return the page size a response was served with."""
+
+    def get_remaining_values(self, response: Response) -> t.Iterable[int]:
+        """Return the offsets of the pages that follow the current page."""
+
+
+class PageSizeController:
+    """Adapt the page size to the latency and size of the responses.
+
+    The page size doubles while pages are fast and small, is halved when a page
+    is slow, large or fails, and never exceeds the `maxResults` the server
+    reports back, since Jira silently caps it per endpoint.
+    """
+
+    #: Pages larger than this are considered too large.
+    max_page_bytes = 8 * 1024 * 1024
+
+    def __init__(
+        self,
+        page_size: int,
+        min_page_size: int = 10,
+        max_page_size: int = 1000,
+        target_latency: float = 5.0,
+    ) -> None:
+        """Create a new controller.
+
+        Args:
+            page_size: The initial page size.
+            min_page_size: The smallest page size to use.
+            max_page_size: The largest page size to use.
+            target_latency: The page latency in seconds to stay below.
+        """
+        self.min_page_size = min_page_size
+        self.max_page_size = max(min_page_size, max_page_size)
+        self.target_latency = target_latency
+        self.page_size = min(max(page_size, min_page_size), self.max_page_size)
+
+    def observe(self, response: Response) -> None:
+        """Adjust the page size after a successful response.
+
+        Args:
+            response: API response object.
+        """
+        requested = requested_page_size(response)
+        data = decode_json(response)
+        server_max = data.get("maxResults") if isinstance(data, dict) else None
+        if requested and server_max is not None and server_max < requested:
+            self.max_page_size = max(self.min_page_size, server_max)
+            self.page_size = min(self.page_size, self.max_page_size)
+            return
+
+        latency = response.elapsed.total_seconds()
+        size = len(response.content)
+        if latency > self.target_latency or size > self.max_page_bytes:
+            self.shrink()
+        elif latency < self.target_latency / 2 and size < self.max_page_bytes / 2:
+            self.page_size = min(self.page_size * 2, self.max_page_size)
+
+    def shrink(self) -> None:
+        """Halve the page size, e.g. after a timeout or a server error."""
+        self.page_size = max(self.page_size // 2, self.min_page_size)
+
+
+class AdaptiveOffsetPaginator(BaseOffsetPaginator):
+    """Offset paginator that reports responses to a page size controller."""
+
+    def __init__(
+        self,
+        start_value: int,
+        page_size: int,
+        page_size_controller: PageSizeController | None = None,
+    ) -> None:
+        """Create a new paginator.
+
+        @param start_value:
+        @param page_size:
+        @param page_size_controller:
+        """
+        super().__init__(start_value, page_size)
+        self._page_size_controller = page_size_controller
+
+    def advance(self, response: Response) -> None:
+        """Let the page size controller observe the response and advance.
+
+        @param response:
+        @return:
+        """
+        if self._page_size_controller:
+            self._page_size_controller.observe(response)
+        super().advance(response)
+
+    def get_page_size(self, response: Response) -> int:
+        """Return the page size a response was served with.
+
+        @param response:
+        @return:
+        """
+        return requested_page_size(response) or self._page_size
+
+
+class JiraPaginator(AdaptiveOffsetPaginator):
     """Jira paginator class."""
 
     def get_total(self, response: Response) -> int | None:
         """Determine the total number of records from the response."""
-        return next(extract_jsonpath("$.total", response.json()), None)
+        return next(extract_jsonpath("$.total", decode_json(response)), None)
 
     def has_more(self, response: Response) -> bool:
         """Determine the next page token from the response.
 
+        Some Agile endpoints do not return a total, but do tell if the page is
+        the last one.
+
+        @param response:
+        @return:
+        """
+        is_last = decode_json(response).get("isLast")
+        if is_last is not None:
+            return not is_last
+        return (self.get_total(response) or 0) > self.get_next(response)
+
+    def get_next(self, response: Response) -> int:
+        """Get the next page offset, using the page size the server applied.
+
+        @param response:
+        @return:
+        """
+        data = decode_json(response)
+        return data.get("startAt", self.current_value) + data.get(
+            "maxResults",
+            self._page_size,
+        )
+
+    def get_remaining_values(self, response: Response) -> list[int]:
+        """Return the offsets of the pages that follow the current page.
+
+        @param response:
+        @return:
+        """
+        total = self.get_total(response) or 0
+        return list(range(self.current_value, total, self.get_page_size(response)))
+
+    def get_page_size(self, response: Response) -> int:
+        """Return the page size Jira applied, which may be below the requested one.
+
         @param response:
         @return:
         """
-        return self.get_total(response) > self.get_next(response)
+        return decode_json(response).get("maxResults") or self._page_size
 
 
-class OffsetPaginator(BaseOffsetPaginator):
-    """Offset paginator class."""
+class OffsetPaginator(AdaptiveOffsetPaginator):
+    """Offset paginator class.
+
+    For endpoints that filter a page after selecting it, such as the users
+    endpoint, which can return short pages before the last one.
+    """
 
     def has_more(self, response: Response) -> bool:
-        """Whether there are more records to paginate.
+        """Whether there are more records to paginate, until an empty page.
 
         @param response:
         @return:
         """
-        return len(response.json()) == self._page_size
+        return len(decode_json(response)) > 0
+
+    def get_next(self, response: Response) -> int:
+        """Get the next page offset, using the requested page size.
+
+        @param response:
+        @return:
+        """
+        return self.current_value + self.get_page_size(response)
+
+    def get_remaining_values(self, response: Response) -> t.Iterator[int]:
+        """Return the offsets of the pages that may follow the current page.
 
-    def get_next(self, response: Response) -> int | None:
-        """Get the next page token from the response.
+        The total is unknown, so the offsets go on until the caller stops.
 
         @param response:
         @return:
         """
-        return len(response.json()) + self.current_value
+        return itertools.count(self.current_value, self.get_page_size(response))
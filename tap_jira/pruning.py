@@ -0,0 +1,104 @@
+"""Pruning of unused Jira boilerplate from records."""
+
+from __future__ import annotations
+
+import re
+import typing as t
+
+#: Properties that Jira adds to most objects but that carry no data.
+DEFAULT_PRUNE_PATHS = (
+    "$..self",
+    "$..expand",
+    "$..avatarUrls",
+    "$..iconUrl",
+    "$..statusCategory.colorName",
+)
+
+_STEP = re.compile(r"(\.\.?)(\*|[^.\[\]]+)")
+
+# A rule is a list of (recursive, name) steps, a state is (rule index, step index).
+_Rule = t.List[t.Tuple[bool, str]]
+_States = t.FrozenSet[t.Tuple[int, int]]
+
+
+def _parse_rule(path: str) -> _Rule:
+    """Parse a JSONPath-like drop rule, e.g. ``$..author.avatarUrls``.
+
+    Only child (``.``) and descendant (``..``) steps with a property name or
+    ``*`` are supported. Arrays are always traversed, so ``[*]`` is optional.
+    """
+    expression = path.replace("[*]", "")
+    steps = _STEP.findall(expression[1:])
+    if (
+        not expression.startswith("$")
+        or not steps
+        or "".join(separator + name for separator, name in steps) != expression[1:]
+    ):
+        msg = f"Invalid prune path: '{path}'"
+        raise ValueError(msg)
+    return [(separator == "..", name) for separator, name in steps]
+
+
+class RecordPruner:
+    """Drop properties matching a set of paths from records, in a single pass.
+
+    The paths are compiled into a state machine that is walked alongside the
+    record, so each property is visited at most once no matter how many rules
+    there are. Transitions are cached since Jira records share their shape.
+    """
+
+    def __init__(self, paths: t.Iterable[str] = DEFAULT_PRUNE_PATHS) -> None:
+        """Compile the drop rules.
+
+        Args:
+            paths: The JSONPath-like paths of properties to drop.
+        """
+        self._rules = [_parse_rule(path) for path in paths]
+        self._start: _States = frozenset(
+            (index, 0) for index in range(len(self._rules))
+        )
+        self._transitions: dict[tuple[_States, str], tuple[bool, _States]] = {}
+
+    def prune(self, record: dict) -> dict:
+        """Drop matching properties from a record, in place.
+
+        Args:
+            record: The record to prune.
+
+        Returns:
+            The pruned record.
+        """
+        if self._rules:
+            self._prune(record, self._start)
+        return record
+
+    def _prune(self, node: t.Any, states: _States) -> None:  # noqa: ANN401
+        if isinstance(node, dict):
+            for key in list(node):
+                drop, next_states = self._transition(states, key)
+                if drop:
+                    del node[key]
+                elif next_states:
+                    self._prune(node[key], next_states)
+        elif isinstance(node, list):
+            for item in node:
+                self._prune(item, states)
+
+    def _transition(self, states: _States, key: str) -> tuple[bool, _States]:
+        transition = self._transitions.get((states, key))
+        if transition is None:
+            drop = False
+            next_states = set()
+            for rule_index, step_index in states:
+                rule = self._rules[rule_index]
+                recursive, name = rule[step_index]
+                if recursive:
+                    next_states.add((rule_index, step_index))
+                if name in ("*", key):
+                    if step_index + 1 == len(rule):
+                        drop = True
+                    else:
+                        next_states.add((rule_index, step_index + 1))
+            transition = (drop, frozenset(next_states))
+            self._transitions[(states, key)] = transition
+        return transition
@@ -0,0 +1,304 @@
+"""Recording of HTTP traffic to an archive, and offline replay from it.
+
+The archive is a gzip compressed JSON Lines file with one request/response pair
+per line. Only the method, path, query and body of requests are recorded, so
+credentials never end up in the archive.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import gzip
+import hashlib
+import json
+import threading
+import typing as t
+from datetime import timedelta
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from tap_jira.transport import SerialTransport
+
+if t.TYPE_CHECKING:
+    from concurrent.futures import Future
+
+HTTP_ARCHIVE_MODES = ("off", "record", "replay")
+
+#: Properties holding personal data, replaced when PII is redacted.
+PII_KEYS = ("emailAddress", "displayName", "timeZone", "locale")
+
+_lock = threading.Lock()
+_started: set[str] = set()
+
+
+class ReplayMissError(requests.exceptions.RequestException):
+    """Raised when the archive holds no response for a request."""
+
+
+def _request_key(request: requests.PreparedRequest) -> str:
+    body = request.body or b""
+    if isinstance(body, bytes):
+        body = body.decode()
+    return f"{request.method} {request.path_url} {body}"
+
+
+def _pseudonym(value: str) -> str:
+    digest = hashlib.sha256(value.encode()).hexdigest()[:12]
+    return f"{digest}@example.invalid" if "@" in value else f"redacted-{digest}"
+
+
+def redact_pii(data: t.Any) -> t.Any:  # noqa: ANN401
+    """Replace personal data in a decoded response with stable pseudonyms.
+
+    The same value always gets the same pseudonym, so records that refer to
+    the same person still do so after redaction.
+
+    Args:
+        data: The decoded JSON response.
+
+    Returns:
+        The redacted data.
+    """
+    if isinstance(data, dict):
+        return {
+            key: _pseudonym(value)
+            if key in PII_KEYS and isinstance(value, str)
+            else redact_pii(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [redact_pii(item) for item in data]
+    return data
+
+
+class RecordingTransport(SerialTransport):
+    """Record the responses of another transport to an archive.
+
+    The archive is truncated the first time it is written to by a process and
+    shared by the transports of all streams. Every entry is written as its own
+    gzip member, so the archive stays readable if the tap is interrupted.
+    """
+
+    def __init__(
+        self,
+        transport: SerialTransport,
+        path: str | Path,
+        *,
+        redact: bool = False,
+        domain: str | None = None,
+    ) -> None:
+        """Create a new transport.
+
+        Args:
+            transport: The transport that sends the requests.
+            path: The archive file.
+            redact: Whether to redact personal data and the Jira domain.
+            domain: The Jira domain, replaced in responses when redacting.
+        """
+        super().__init__(
+            transport.session,
+            transport.timeout,
+            transport.max_concurrency,
+        )
+        self.transport = transport
+        self.concurrent = transport.concurrent
+        self.path = str(path)
+        self.redact = redact
+        self.domain = domain
+
+    def send(self, request: requests.PreparedRequest) -> requests.Response:
+        """Send a single request and record the response.
+
+        Args:
+            request: The prepared request.
+
+        Returns:
+            The response.
+        """
+        return self._record(request, self.transport.send(request))
+
+    def send_hedged(
+        self,
+        request: requests.PreparedRequest,
+        hedge_after: float | None = None,
+        deadline: float | None = None,
+    ) -> requests.Response:
+        """Send a hedged request and record the response.
+
+        Args:
+            request: The prepared request.
+            hedge_after: Seconds to wait before sending a duplicate, or None.
+            deadline: Seconds to wait for any response, or None.
+
+        Returns:
+            The first successful response.
+        """
+        response = self.transport.send_hedged(request, hedge_after, deadline)
+        return self._record(request, response)
+
+    def submit(
+        self,
+        request: requests.PreparedRequest,
+        hedge_after: float | None = None,
+        deadline: float | None = None,
+    ) -> Future:
+        """Send a request with the wrapped transport, recording the response.
+
+        Args:
+            request: The prepared request.
+            hedge_after: Seconds to wait before sending a duplicate, or None.
+            deadline: Seconds to wait for any response, or None.
+
+        Returns:
+            A future for the response.
+        """
+        future = self.transport.submit(request, hedge_after, deadline)
+
+        def record(done: Future) -> None:
+            if not done.cancelled() and done.exception() is None:
+                self._record(request, done.result())
+
+        future.add_done_callback(record)
+        return future
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self.transport.close()
+
+    def _record(
+        self,
+        request: requests.PreparedRequest,
+        response: requests.Response,
+    ) -> requests.Response:
+        content = response.text
+        if self.redact:
+            if self.domain:
+                content = content.replace(self.domain, "jira.example.invalid")
+            with contextlib.suppress(ValueError):
+                content = json.dumps(redact_pii(json.loads(content)))
+        entry = {
+            "request": _request_key(request),
+            "status": response.status_code,
+            "content_type": response.headers.get("Content-Type"),
+            "elapsed": response.elapsed.total_seconds(),
+            "content": content,
+        }
+        member = gzip.compress(json.dumps(entry).encode() + b"\n")
+        with _lock:
+            mode = "ab" if self.path in _started else "wb"
+            _started.add(self.path)
+            with Path(self.path).open(mode) as archive:
+                archive.write(member)
+        return response
+
+
+def load_archive(path: str | Path) -> dict[str, list[dict]]:
+    """Read an archive into lists of recorded responses by request.
+
+    Archives are cached by path and modification time, so the transports of
+    all streams share one copy, which must not be modified.
+
+    Args:
+        path: The archive file.
+
+    Returns:
+        The recorded entries by request key, in recording order.
+    """
+    resolved = Path(path).resolve()
+    return _load_archive(str(resolved), resolved.stat().st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_archive(
+    path: str,
+    mtime_ns: int,  # noqa: ARG001
+) -> dict[str, list[dict]]:
+    entries: dict[str, list[dict]] = {}
+    with gzip.open(path, "rt") as archive:
+        for line in archive:
+            entry = json.loads(line)
+            entries.setdefault(entry["request"], []).append(entry)
+    return entries
+
+
+class ReplayTransport(SerialTransport):
+    """Serve responses from an archive, without touching the network.
+
+    Responses to a repeated request are served in recording order, after which
+    the last one is served again.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        concurrent: bool = False,
+    ) -> None:
+        """Load the archive.
+
+        Args:
+            path: The archive file.
+            concurrent: Whether to replay like a concurrent transport, which
+                should match the transport used when recording.
+        """
+        super().__init__(requests.Session(), timeout=0)
+        self.concurrent = concurrent
+        self.path = str(path)
+        self._entries = load_archive(path)
+        self._served: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def send(self, request: requests.PreparedRequest) -> requests.Response:
+        """Return the recorded response to a request.
+
+        Args:
+            request: The prepared request.
+
+        Returns:
+            The response.
+
+        Raises:
+            ReplayMissError: If the request was not recorded.
+        """
+        key = _request_key(request)
+        entries = self._entries.get(key)
+        if not entries:
+            msg = f"No recorded response in {self.path} for {key.strip()}"
+            raise ReplayMissError(msg, request=request)
+        with self._lock:
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+        entry = entries[min(index, len(entries) - 1)]
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(
+            {"Content-Type": entry["content_type"]} if entry["content_type"] else {},
+        )
+        response._content = entry["content"].encode()  # noqa: SLF001
+        response.encoding = "utf-8"
+        response.url = request.url or ""
+        response.elapsed = timedelta(seconds=entry["elapsed"])
+        response.request = request
+        return response
+
+    def send_hedged(
+        self,
+        request: requests.PreparedRequest,
+        hedge_after: float | None = None,  # noqa: ARG002
+        deadline: float | None = None,  # noqa: ARG002
+    ) -> requests.Response:
+        """Return the recorded response, replayed responses are never late.
+
+        Args:
+            request: The prepared request.
+            hedge_after: Ignored.
+            deadline: Ignored.
+
+        Returns:
+            The response.
+        """
+        return self.send(request)
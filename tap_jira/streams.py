@@ -2,17 +2,25 @@
 
 from __future__ import annotations
 
+import base64
+import hashlib
+import json
+import math
 import sys
 import typing as t
+from datetime import datetime
 from http import HTTPStatus
+from itertools import islice
 from typing import Any
 
 import requests
 from singer_sdk import typing as th  # JSON Schema typing helpers
 from singer_sdk.helpers.jsonpath import extract_jsonpath
 
+from tap_jira.cache import LRUCache
 from tap_jira.client import JiraStream
 from tap_jira.paginators import JiraPaginator, OffsetPaginator
+from tap_jira.webhook import IssueSpool
 
 USER_PROPERTY = th.ObjectType(
     th.Property("displayName", th.StringType),
@@ -21,10 +29,35 @@ USER_PROPERTY = th.ObjectType(
     th.Property("active", th.BooleanType),
 )
 
+#: The maximum number of issues the bulk fetch endpoint returns per request.
+BULK_FETCH_SIZE = 100
+
+#: The size in bytes of the hash kept per user by `incremental_users`.
+USER_HASH_SIZE = 8
+
 if t.TYPE_CHECKING:
     from singer_sdk.pagination import BaseAPIPaginator
 
 
+def _parse_datetime(value: str) -> datetime:
+    """Parse a Jira timestamp, e.g. ``2021-01-19T23:45:00.000+0000``."""
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+
+
+def _pack_hashes(hashes: set[bytes]) -> str:
+    """Return user hashes as one base64 string, compact enough for the state."""
+    return base64.b64encode(b"".join(sorted(hashes))).decode()
+
+
+def _unpack_hashes(packed: str) -> set[bytes]:
+    """Return the user hashes of a string from `_pack_hashes`."""
+    raw = base64.b64decode(packed)
+    return {
+        raw[index : index + USER_HASH_SIZE]
+        for index in range(0, len(raw), USER_HASH_SIZE)
+    }
+
+
 class JiraAgileApiStream(JiraStream):
     """Base class for Jira Agile API streams."""
 
@@ -33,6 +66,18 @@ class JiraAgileApiStream(JiraStream):
         """Return the API URL root, configurable via tap settings."""
         return f"https://{self.config['domain']}/rest/agile/1.0"
 
+    def get_new_paginator(self) -> BaseAPIPaginator:
+        """Create a new pagination helper instance.
+
+        Returns:
+            A pagination helper instance.
+        """
+        return JiraPaginator(
+            start_value=0,
+            page_size=self.page_size,
+            page_size_controller=self.page_size_controller,
+        )
+
 
 class BoardsStream(JiraAgileApiStream):
     """Boards stream."""
@@ -59,7 +104,38 @@ class BoardsStream(JiraAgileApiStream):
         ),
     ).to_dict()
 
-    def get_child_context(self, record: dict, context: dict | None) -> dict | None:
+    def get_records(self, context: dict | None) -> t.Iterable[dict]:
+        """Return boards, prefetching the first child page of each board.
+
+        With a concurrent transport, boards are buffered in windows of
+        `max_concurrent_requests` and the child streams fetch the first page
+        for every board in the window at once before the boards are emitted.
+
+        @param context:
+        @return:
+        """
+        records = iter(super().get_records(context))
+        issues_stream = self._planned_issues_stream()
+        if issues_stream is not None:
+            records = iter(self._plan(list(records), context, issues_stream))
+        if not self.transport.concurrent:
+            yield from records
+            return
+
+        child_streams = [
+            child
+            for child in self.child_streams
+            if isinstance(child, JiraStream)
+            and (child.selected or child.has_selected_descendents)
+        ]
+        window_size = self.config.get("max_concurrent_requests", 10)
+        while window := list(islice(records, window_size)):
+            contexts = [self.get_child_context(record, context) for record in window]
+            for child in child_streams:
+                child.prefetch(contexts)
+            yield from window
+
+    def get_child_context(self, record: dict, context: dict | None) -> dict:
         """Return a dictionary of values to be used in URL parameterization.
 
         @param record:
@@ -68,6 +144,51 @@ class BoardsStream(JiraAgileApiStream):
         """
         return {"board_id": record["id"]}
 
+    def _planned_issues_stream(self) -> IssuesStream | None:
+        if not self.config.get("plan_issue_sync"):
+            return None
+        return next(
+            (
+                child
+                for child in self.child_streams
+                if isinstance(child, IssuesStream)
+                and (child.selected or child.has_selected_descendents)
+            ),
+            None,
+        )
+
+    def _plan(
+        self,
+        records: list[dict],
+        context: dict | None,
+        issues_stream: IssuesStream,
+    ) -> list[dict]:
+        """Probe the pending issues of every board and order boards largest first.
+
+        Boards whose total could not be probed are synced first, since they may
+        be large.
+
+        @param records:
+        @param context:
+        @param issues_stream:
+        @return:
+        """
+        contexts = [self.get_child_context(record, context) for record in records]
+        totals = issues_stream.plan(contexts)
+        pending = [total for total in totals.values() if total]
+        self.logger.info(
+            "Planned issues sync: %d of %d boards have %d pending issues",
+            len(pending),
+            len(records),
+            sum(pending),
+        )
+
+        def largest_first(record: dict) -> float:
+            total = totals.get(record["id"])
+            return -math.inf if total is None else -total
+
+        return sorted(records, key=largest_first)
+
 
 class SprintsStream(JiraAgileApiStream):
     """Sprints stream."""
@@ -117,7 +238,8 @@ class SprintsStream(JiraAgileApiStream):
 class IssuesStream(JiraAgileApiStream):
     """Issues stream."""
 
-    parent_stream_type = BoardsStream
+    # Optional, since the spooled issues stream has no parent.
+    parent_stream_type: type[JiraStream] | None = BoardsStream
     name = "issues"
     path = "/board/{board_id}/issue"
     primary_keys: t.ClassVar[list[str]] = ["id"]
@@ -125,6 +247,15 @@ class IssuesStream(JiraAgileApiStream):
     records_jsonpath = "$.issues[*]"
     next_page_token_jsonpath = "$.startAt"  # noqa: S105
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the stream."""
+        super().__init__(*args, **kwargs)
+        self._parent_cache: LRUCache[str, dict] | None = None
+        #: The pending issues per board id, set by `plan`.
+        self.planned_totals: dict[int, int | None] | None = None
+        #: The changelog of the issue whose child streams are being synced.
+        self.current_changelog: dict = {}
+
     @property
     def custom_field_mapping(self) -> dict:
         """Custom field mapping from config."""
@@ -218,6 +349,12 @@ class IssuesStream(JiraAgileApiStream):
                                     th.Property("summary", th.StringType),
                                     issue_type,
                                     status,
+                                    # Only set when parents are hydrated
+                                    th.Property("labels", th.ArrayType(th.StringType)),
+                                    *[
+                                        th.Property(key, th.StringType)
+                                        for key in self.custom_field_mapping.values()
+                                    ],
                                 ),
                             ),
                         ),
@@ -236,7 +373,7 @@ class IssuesStream(JiraAgileApiStream):
         self,
         context: dict | None,
         next_page_token: Any | None,  # noqa: ANN401
-    ) -> dict | None:
+    ) -> dict[str, Any]:
         """Return a JSON payload object for a request.
 
         Args:
@@ -264,26 +401,98 @@ class IssuesStream(JiraAgileApiStream):
             "jql": " ".join(clauses),
             "expand": "changelog",
             "fieldsByKeys": True,
-            "fields": [
-                "summary",
-                "project",
-                "status",
-                "assignee",
-                "issuetype",
-                "parent",
-                "sprint",
-                "updated",
-                "created",
-                "labels",
-                *self.custom_field_mapping.keys(),
-            ],
+            "fields": self.fields,
             "validateQuery": True,
         }
 
+    @property
+    def fields(self) -> list[str]:
+        """The issue fields to request."""
+        return [
+            "summary",
+            "project",
+            "status",
+            "assignee",
+            "issuetype",
+            "parent",
+            "sprint",
+            "updated",
+            "created",
+            "labels",
+            *self.custom_field_mapping.keys(),
+        ]
+
+    def plan(self, contexts: list[dict]) -> dict[int, int | None]:
+        """Request the number of issues each board has pending since its bookmark.
+
+        One request with ``maxResults=0`` is sent per board, concurrently with a
+        concurrent transport. Boards without pending issues are skipped when
+        the stream syncs them afterwards.
+
+        @param contexts:
+        @return:
+        """
+        prepared_requests = []
+        for context in contexts:
+            self._write_starting_replication_value(context)
+            prepared_requests.append(
+                self.build_prepared_request(
+                    method=self.rest_method,
+                    url=self.get_url(context),
+                    params={**self.get_url_params(context, None), "maxResults": 0},
+                    headers=self.http_headers,
+                ),
+            )
+
+        self.planned_totals = {}
+        responses = self.transport.send_all(
+            prepared_requests,
+            **(self._hedging(prepared_requests[0]) if prepared_requests else {}),
+        )
+        for context, response in zip(contexts, responses):
+            total = None
+            # Boards that could not be probed are synced as usual.
+            if isinstance(response, requests.Response) and response.ok:
+                total = response.json().get("total")
+            self.planned_totals[context["board_id"]] = total
+        return self.planned_totals
+
+    def is_idle(self, context: dict | None) -> bool:
+        """Whether the planner found no pending issues for the board.
+
+        @param context:
+        @return:
+        """
+        board_id = (context or {}).get("board_id")
+        return bool(
+            self.planned_totals is not None
+            and board_id is not None
+            and self.planned_totals.get(board_id) == 0,
+        )
+
+    def get_records(self, context: dict | None) -> t.Iterable[dict]:
+        """Return the issues of a board, unless the planner found it idle.
+
+        @param context:
+        @return:
+        """
+        if self.is_idle(context):
+            self.logger.debug("Skipping board %s without pending issues", context)
+            return
+        yield from super().get_records(context)
+
+    def prefetch(self, contexts: list[dict]) -> None:
+        """Prefetch the first page of the boards that have pending issues.
+
+        @param contexts:
+        @return:
+        """
+        super().prefetch([context for context in contexts if not self.is_idle(context)])
+
     def post_process(
         self,
         row: dict,
-        context: dict | None = None,  # noqa: ARG002
+        context: dict | None = None,
     ) -> dict | None:
         """As needed, append or transform raw data to match expected structure.
 
@@ -294,21 +503,179 @@ class IssuesStream(JiraAgileApiStream):
         Returns:
             The updated record dictionary, or ``None`` to skip the record.
         """
-        row["fields"].update({
-            self.custom_field_mapping[key]: value
-            for key, value in row["fields"].items()
-            if key in self.custom_field_mapping
-        })
+        pruned = super().post_process(row, context)
+        if pruned is None:
+            return None
+        row = pruned
+        self._rename_custom_fields(row["fields"])
+        row["updated"] = row["fields"]["updated"]
+        # Issues that are not fetched through a board have no sprint field.
+        row["sprint_id"] = (
+            row["fields"]["sprint"]["id"] if row["fields"].get("sprint") else None
+        )
+        return row
+
+    def _rename_custom_fields(self, fields: dict) -> None:
+        fields.update(
+            {
+                self.custom_field_mapping[key]: value
+                for key, value in fields.items()
+                if key in self.custom_field_mapping
+            },
+        )
 
         # Remove custom field IDs from the fields object
         for key in self.custom_field_mapping:
-            row["fields"].pop(key, None)
+            fields.pop(key, None)
 
-        row["updated"] = row["fields"]["updated"]
-        row["sprint_id"] = (
-            row["fields"]["sprint"]["id"] if row["fields"]["sprint"] else None
+    def parse_response(self, response: requests.Response) -> t.Iterable[dict]:
+        """Parse a page of issues, hydrating their parents if enabled.
+
+        @param response:
+        @return:
+        """
+        records = list(super().parse_response(response))
+        if self.config.get("hydrate_parents"):
+            self.hydrate_parents(records)
+        yield from records
+
+    def hydrate_parents(self, records: list[dict]) -> None:
+        """Replace the parent stubs of a page of issues with the parents' fields.
+
+        Parents that are not cached yet are fetched with one bulk request per
+        100 keys, and kept in an LRU cache so popular epics are fetched once.
+
+        @param records:
+        @return:
+        """
+        parents = [
+            record["fields"]["parent"]
+            for record in records
+            if record.get("fields", {}).get("parent")
+        ]
+        resolved: dict[str, dict] = {}
+        for parent in parents:
+            cached = self.parent_cache.get(parent["key"])
+            if cached is not None:
+                resolved[parent["key"]] = cached
+        missing = sorted({parent["key"] for parent in parents} - resolved.keys())
+        for start in range(0, len(missing), BULK_FETCH_SIZE):
+            keys = missing[start : start + BULK_FETCH_SIZE]
+            resolved.update(self._fetch_parent_fields(keys))
+
+        for parent in parents:
+            parent["fields"] = {**parent.get("fields", {}), **resolved[parent["key"]]}
+
+    @property
+    def parent_cache(self) -> LRUCache[str, dict]:
+        """Return the cache of hydrated parent fields, by issue key."""
+        if self._parent_cache is None:
+            self._parent_cache = LRUCache(self.config.get("parent_cache_size", 1000))
+        return self._parent_cache
+
+    def bulk_fetch(
+        self,
+        ids_or_keys: list[str],
+        fields: list[str],
+        expand: list[str] | None = None,
+    ) -> list[dict]:
+        """Fetch up to 100 issues by id or key in one request.
+
+        Issues that do not exist or are not visible are left out.
+
+        @param ids_or_keys:
+        @param fields:
+        @param expand:
+        @return:
+        """
+        prepared_request = self.build_prepared_request(
+            method="POST",
+            url=f"https://{self.config['domain']}/rest/api/3/issue/bulkfetch",
+            headers=self.http_headers,
+            json={
+                "issueIdsOrKeys": ids_or_keys,
+                "fields": fields,
+                "fieldsByKeys": True,
+                **({"expand": expand} if expand else {}),
+            },
+        )
+        response = self.request_decorator(self._request)(prepared_request, None)
+        return response.json().get("issues", [])
+
+    def _fetch_parent_fields(self, keys: list[str]) -> dict[str, dict]:
+        issues = self.bulk_fetch(
+            keys,
+            fields=[
+                "summary",
+                "issuetype",
+                "status",
+                "labels",
+                *self.custom_field_mapping.keys(),
+            ],
         )
-        return row
+
+        # Keys Jira could not return are cached as empty to avoid refetching.
+        fetched: dict[str, dict] = {key: {} for key in keys}
+        for issue in issues:
+            fields = self.pruner.prune(issue.get("fields") or {})
+            self._rename_custom_fields(fields)
+            fetched[issue["key"]] = fields
+        for key, fields in fetched.items():
+            self.parent_cache[key] = fields
+        return fetched
+
+    def get_child_context(
+        self,
+        record: dict,
+        context: dict | None,  # noqa: ARG002
+    ) -> dict | None:
+        """Return the issue context for the field history stream.
+
+        The changelog is kept on the stream instead of being passed in the
+        context, since the context is logged for every child sync.
+
+        @param record:
+        @param context:
+        @return:
+        """
+        self.current_changelog = record.get("changelog") or {}
+        return {"issue_id": record["id"], "issue_key": record["key"]}
+
+
+class IssueFieldHistoryStream(JiraStream):
+    """Issue field history stream.
+
+    Derived from the changelog of the issues stream: one row per history item,
+    for the histories created after the bookmark. Jira truncates long changelogs
+    in the issue, those are paged from the changelog endpoint instead.
+    """
+
+    parent_stream_type = IssuesStream
+    name = "issue_field_history"
+    path = "/issue/{issue_id}/changelog"
+    records_jsonpath = "$.values[*]"
+    # A history can change the same field more than once, e.g. two attachments.
+    primary_keys: t.ClassVar[list[str]] = ["issue_id", "history_id", "item_index"]
+    replication_key = "created"
+    # A single bookmark for the whole stream rather than one per issue.
+    state_partitioning_keys: t.ClassVar[list[str]] = []
+    is_sorted = False
+
+    schema = th.PropertiesList(
+        th.Property("issue_id", th.StringType),
+        th.Property("issue_key", th.StringType),
+        th.Property("history_id", th.StringType),
+        th.Property("item_index", th.IntegerType),
+        th.Property("created", th.DateTimeType),
+        th.Property("author_account_id", th.StringType),
+        th.Property("field", th.StringType),
+        th.Property("fieldId", th.StringType),
+        th.Property("fieldtype", th.StringType),
+        th.Property("from", th.StringType),
+        th.Property("fromString", th.StringType),
+        th.Property("to", th.StringType),
+        th.Property("toString", th.StringType),
+    ).to_dict()
 
     def get_new_paginator(self) -> BaseAPIPaginator:
         """Create a new pagination helper instance.
@@ -316,7 +683,135 @@ class IssuesStream(JiraAgileApiStream):
         Returns:
             A pagination helper instance.
         """
-        return JiraPaginator(start_value=0, page_size=self._page_size)
+        return JiraPaginator(
+            start_value=0,
+            page_size=self.page_size,
+            page_size_controller=self.page_size_controller,
+        )
+
+    def get_url_params(
+        self,
+        context: dict | None,
+        next_page_token: Any | None,  # noqa: ANN401
+    ) -> dict[str, Any]:
+        """Return the paging parameters, the changelog is always sorted by creation.
+
+        @param context:
+        @param next_page_token:
+        @return:
+        """
+        params = super().get_url_params(context, next_page_token)
+        params.pop("sort", None)
+        params.pop("order_by", None)
+        return params
+
+    def get_records(self, context: dict | None) -> t.Iterable[dict]:
+        """Flatten the changelog histories of the current issue.
+
+        @param context:
+        @return:
+        """
+        if context is None:
+            # Only synced as a child of the issues stream.
+            return
+        issues_stream = t.cast(
+            IssuesStream,
+            self._tap.streams[self.parent_stream_type.name],
+        )
+        bookmark = self.get_starting_timestamp(context)
+        changelog = issues_stream.current_changelog
+        histories = changelog.get("histories") or []
+        if (changelog.get("total") or 0) > len(histories):
+            histories = self.request_records(context)
+
+        for history in histories:
+            created = history.get("created")
+            if not created or (bookmark and _parse_datetime(created) <= bookmark):
+                continue
+            for index, item in enumerate(history.get("items") or []):
+                yield {
+                    "issue_id": context["issue_id"],
+                    "issue_key": context["issue_key"],
+                    "history_id": history.get("id"),
+                    "item_index": index,
+                    "created": created,
+                    "author_account_id": (history.get("author") or {}).get("accountId"),
+                    "field": item.get("field"),
+                    "fieldId": item.get("fieldId"),
+                    "fieldtype": item.get("fieldtype"),
+                    "from": item.get("from"),
+                    "fromString": item.get("fromString"),
+                    "to": item.get("to"),
+                    "toString": item.get("toString"),
+                }
+
+
+class SpooledIssuesStream(IssuesStream):
+    """Issues stream that only fetches the issues in the webhook spool.
+
+    The ids spooled by :mod:`tap_jira.webhook` since the last sync are fetched
+    in bulk. Without a cursor for the same spool in the state, or when events
+    were trimmed from the spool before they were read, the issues updated since
+    the bookmark are fetched with a JQL search instead.
+    """
+
+    parent_stream_type = None
+    path = "/search"
+
+    @property
+    def url_base(self) -> str:
+        """Return the API URL root, configurable via tap settings."""
+        return f"https://{self.config['domain']}/rest/api/3"
+
+    def get_records(self, context: dict | None) -> t.Iterable[dict]:
+        """Return the spooled issues, or catch up with a JQL search.
+
+        @param context:
+        @return:
+        """
+        spool = IssueSpool(self.config["webhook_spool"])
+        state = self.get_context_state(context)
+        cursor = state.get("spool_cursor")
+
+        if cursor is None or spool.has_gap(cursor, state.get("spool_id")):
+            self.logger.info("Events are missing from the spool, catching up with JQL")
+            # Events spooled during the search are read on the next sync.
+            cursor = spool.last_seq()
+            yield from super().get_records(context)
+        else:
+            events = spool.read(after=cursor)
+            if events:
+                cursor = events[-1][0]
+            issue_ids = list(dict.fromkeys(issue_id for _, issue_id in events))
+            self.logger.info("Fetching %d issues from the spool", len(issue_ids))
+            yield from self._fetch_issues(issue_ids, context)
+
+        state["spool_id"] = spool.spool_id
+        state["spool_cursor"] = cursor
+
+    def _fetch_issues(
+        self,
+        issue_ids: list[str],
+        context: dict | None,
+    ) -> t.Iterable[dict]:
+        for start in range(0, len(issue_ids), BULK_FETCH_SIZE):
+            records = self.bulk_fetch(
+                issue_ids[start : start + BULK_FETCH_SIZE],
+                fields=self.fields,
+                expand=["changelog"],
+            )
+            if self.config.get("hydrate_parents"):
+                self.hydrate_parents(records)
+            for record in records:
+                transformed = self.post_process(record, context)
+                if transformed is not None:
+                    yield transformed
+
+
+class SpooledIssueFieldHistoryStream(IssueFieldHistoryStream):
+    """Issue field history stream of the spooled issues."""
+
+    parent_stream_type = SpooledIssuesStream
 
 
 class UsersStream(JiraStream):
@@ -326,6 +821,8 @@ class UsersStream(JiraStream):
     path = "/users"
     primary_keys: t.ClassVar[list[str]] = ["accountId"]
     replication_key = None
+    # Pages are bare lists, without the `maxResults` Jira applied.
+    _max_page_size = 100
 
     schema = th.PropertiesList(
         th.Property("accountId", th.StringType),
@@ -341,7 +838,49 @@ class UsersStream(JiraStream):
         Returns:
             A pagination helper instance.
         """
-        return OffsetPaginator(start_value=0, page_size=self._page_size)
+        return OffsetPaginator(
+            start_value=0,
+            page_size=self.page_size,
+            page_size_controller=self.page_size_controller,
+        )
+
+    def get_records(self, context: dict | None) -> t.Iterable[dict]:
+        """Return users, or only new and changed users with `incremental_users`.
+
+        A hash of each user is kept in the stream state, and replaced after a
+        complete sync.
+
+        @param context:
+        @return:
+        """
+        if not self.config.get("incremental_users"):
+            yield from super().get_records(context)
+            return
+
+        state = self.get_context_state(context)
+        previous = _unpack_hashes(state.get("user_hashes", ""))
+        current: set[bytes] = set()
+        for record in super().get_records(context):
+            digest = self._hash(record)
+            current.add(digest)
+            if digest not in previous:
+                yield record
+
+        self.logger.info(
+            "%d of %d users are new or changed",
+            len(current - previous),
+            len(current),
+        )
+        state["user_hashes"] = _pack_hashes(current)
+
+    def _hash(self, record: dict) -> bytes:
+        # Only the properties in the schema, changes to others are not emitted.
+        # The account id is part of the content, so no key is kept per user.
+        content = {key: record.get(key) for key in self.schema["properties"]}
+        return hashlib.blake2b(
+            json.dumps(content, sort_keys=True).encode(),
+            digest_size=USER_HASH_SIZE,
+        ).digest()
 
 
 class WorkflowStatusesStream(JiraStream):
@@ -7,6 +7,11 @@ from singer_sdk import typing as th  # JSON schema typing helpers
 
 # TODO: Import your custom stream types here:
 from tap_jira import streams
+from tap_jira.client import DEFAULT_BATCH_STREAMS
+from tap_jira.pruning import DEFAULT_PRUNE_PATHS
+from tap_jira.recording import HTTP_ARCHIVE_MODES
+from tap_jira.transport import TRANSPORTS
+from tap_jira.validation import VALIDATION_MODES
 
 
 class TapJira(Tap):
@@ -43,7 +48,190 @@ class TapJira(Tap):
             "custom_fields",
             th.ObjectType(additional_properties=th.StringType),
             description="A mapping of custom field IDs to their names",
-        )
+        ),
+        th.Property(
+            "http_transport",
+            th.StringType,
+            default="serial",
+            allowed_values=list(TRANSPORTS),
+            description=(
+                "How requests are sent: 'serial' (one at a time), 'threads' or "
+                "'asyncio' (requires the 'asyncio' extra). The concurrent transports "
+                "fan out the remaining pages of a stream and the first pages of "
+                "child streams"
+            ),
+        ),
+        th.Property(
+            "max_concurrent_requests",
+            th.IntegerType,
+            default=10,
+            description=(
+                "The maximum number of requests in flight for concurrent transports, "
+                "which is also how many pages are fetched ahead of the page parsed"
+            ),
+        ),
+        th.Property(
+            "adaptive_page_size",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Grow the page size while pages are fast and small, and shrink it "
+                "after slow pages, timeouts and server errors"
+            ),
+        ),
+        th.Property(
+            "max_page_size",
+            th.IntegerType,
+            default=1000,
+            description=(
+                "The largest page size to request when adaptive_page_size is "
+                "enabled. The users stream, whose pages do not report the page "
+                "size Jira applied, never requests more than 100"
+            ),
+        ),
+        th.Property(
+            "page_latency_target",
+            th.NumberType,
+            default=5.0,
+            description=(
+                "The page latency in seconds adaptive_page_size aims to stay below"
+            ),
+        ),
+        th.Property(
+            "request_deadlines",
+            th.ObjectType(additional_properties=th.NumberType),
+            description=(
+                "A mapping of stream names to the number of seconds to wait for a "
+                "GET request of that stream, before it is retried"
+            ),
+        ),
+        th.Property(
+            "hedge_requests",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Send a duplicate of a GET request that has not answered within "
+                "hedge_percentile of the recent latencies of its stream, and use "
+                "whichever response arrives first"
+            ),
+        ),
+        th.Property(
+            "hedge_percentile",
+            th.NumberType,
+            default=95,
+            description=(
+                "The latency percentile after which hedge_requests sends a duplicate"
+            ),
+        ),
+        th.Property(
+            "plan_issue_sync",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Before syncing issues, request the number of pending issues of "
+                "each board with maxResults=0, skip boards without pending issues "
+                "and sync the others largest first"
+            ),
+        ),
+        th.Property(
+            "hydrate_parents",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Fetch the summary, type, status, labels and custom fields of the "
+                "parent of each issue, in one bulk request per page of issues"
+            ),
+        ),
+        th.Property(
+            "parent_cache_size",
+            th.IntegerType,
+            default=1000,
+            description="The number of hydrated parent issues to keep in memory",
+        ),
+        th.Property(
+            "webhook_spool",
+            th.StringType,
+            description=(
+                "The SQLite spool file of the tap-jira-webhook receiver. When set, "
+                "only the issues changed since the last sync are fetched, falling "
+                "back to a JQL search when events are missing from the spool"
+            ),
+        ),
+        th.Property(
+            "incremental_users",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Only emit users that are new or changed since the last sync, "
+                "by keeping a hash of every user in the stream state"
+            ),
+        ),
+        th.Property(
+            "batch_streams",
+            th.ArrayType(th.StringType),
+            default=list(DEFAULT_BATCH_STREAMS),
+            description=(
+                "The streams that are written to batch files and emitted as BATCH "
+                "messages when batch_config is set. Other streams emit RECORD messages"
+            ),
+        ),
+        th.Property(
+            "record_validation",
+            th.StringType,
+            default="none",
+            allowed_values=list(VALIDATION_MODES),
+            description=(
+                "Validate records against the stream schema before they are emitted: "
+                "'none', 'sample' (one in validation_sample_rate records, every "
+                "record once one is invalid) or 'full'. Invalid records are logged"
+            ),
+        ),
+        th.Property(
+            "validation_sample_rate",
+            th.IntegerType,
+            default=100,
+            description=(
+                "Validate one in this many records when record_validation is 'sample'"
+            ),
+        ),
+        th.Property(
+            "http_archive_mode",
+            th.StringType,
+            default="off",
+            allowed_values=list(HTTP_ARCHIVE_MODES),
+            description=(
+                "'record' to record all responses to http_archive, 'replay' to "
+                "serve all responses from it without using the network"
+            ),
+        ),
+        th.Property(
+            "http_archive",
+            th.StringType,
+            description=(
+                "The gzip compressed JSONL file responses are recorded to or "
+                "replayed from. Request headers, and so credentials, are never "
+                "recorded"
+            ),
+        ),
+        th.Property(
+            "http_archive_redact_pii",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Replace email addresses, display names, time zones, locales and "
+                "the Jira domain in recorded responses with stable pseudonyms"
+            ),
+        ),
+        th.Property(
+            "prune_paths",
+            th.ArrayType(th.StringType),
+            default=list(DEFAULT_PRUNE_PATHS),
+            description=(
+                "JSONPath-like paths (e.g. '$..avatarUrls') of properties to drop "
+                "from records before they are emitted. Set to an empty list to "
+                "keep everything"
+            ),
+        ),
     ).to_dict()
 
     def discover_streams(self) -> list[streams.JiraStream]:
@@ -52,8 +240,18 @@ class TapJira(Tap):
         Returns:
             A list of discovered streams.
         """
+        if self.config.get("webhook_spool"):
+            issue_streams = [
+                streams.SpooledIssuesStream(self),
+                streams.SpooledIssueFieldHistoryStream(self),
+            ]
+        else:
+            issue_streams = [
+                streams.IssuesStream(self),
+                streams.IssueFieldHistoryStream(self),
+            ]
         return [
-            streams.IssuesStream(self),
+            *issue_streams,
             streams.UsersStream(self),
             streams.BoardsStream(self),
             streams.SprintsStream(self),
@@ -0,0 +1,559 @@
+"""HTTP transports used by Jira streams to send prepared requests."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+import typing as t
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+if t.TYPE_CHECKING:
+    import httpx
+
+_Result = t.Union[requests.Response, Exception]
+
+TRANSPORTS = ("serial", "threads", "asyncio")
+
+
+class LatencyTracker:
+    """Track a percentile of recent request latencies.
+
+    Used to decide when a request has taken long enough that sending a
+    duplicate is likely to answer sooner than waiting for the original.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95,
+        window: int = 200,
+        min_samples: int = 20,
+    ) -> None:
+        """Create a new tracker.
+
+        Args:
+            percentile: The latency percentile to report, between 0 and 100.
+            window: The number of most recent latencies to keep.
+            min_samples: The number of latencies needed before reporting one.
+        """
+        self.percentile = min(max(percentile, 0), 100)
+        self.min_samples = max(1, min_samples)
+        self._latencies: deque[float] = deque(maxlen=window)
+
+    def observe(self, latency: float) -> None:
+        """Record the latency of a request.
+
+        Args:
+            latency: The latency in seconds.
+        """
+        self._latencies.append(latency)
+
+    def threshold(self) -> float | None:
+        """Return the tracked percentile, or None while there are too few samples."""
+        if len(self._latencies) < self.min_samples:
+            return None
+        latencies = sorted(self._latencies)
+        index = math.ceil(self.percentile / 100 * len(latencies)) - 1
+        return latencies[max(index, 0)]
+
+
+class SerialTransport:
+    """Send requests one at a time over a `requests` session."""
+
+    #: Whether submitted requests are sent in the background.
+    concurrent = False
+
+    def __init__(
+        self,
+        session: requests.Session,
+        timeout: float,
+        max_concurrency: int = 1,
+    ) -> None:
+        """Create a new transport.
+
+        Args:
+            session: The session used to send requests.
+            timeout: The request timeout in seconds.
+            max_concurrency: The maximum number of requests in flight.
+        """
+        self.session = session
+        self.timeout = timeout
+        self.max_concurrency = max(1, max_concurrency)
+        self._attempts: ThreadPoolExecutor | None = None
+        self._attempts_lock = threading.Lock()
+
+    def send(self, request: requests.PreparedRequest) -> requests.Response:
+        """Send a single request.
+
+        Args:
+            request: The prepared request.
+
+        Returns:
+            The response.
+        """
+        return self.session.send(request, timeout=self.timeout)
+
+    def send_hedged(
+        self,
+        request: requests.PreparedRequest,
+        hedge_after: float | None = None,
+        deadline: float | None = None,
+    ) -> requests.Response:
+        """Send an idempotent request, hedged and bounded by a deadline.
+
+        If the request has not answered after `hedge_after` seconds, a duplicate
+        is sent and whichever successful response arrives first is returned.
+        Attempts run on a pool of twice `max_concurrency` threads; those still
+        in flight are left to finish in the background and hold their thread
+        until then, and those still waiting for a thread are cancelled.
+
+        Args:
+            request: The prepared request, which must be safe to repeat.
+            hedge_after: Seconds to wait before sending a duplicate, or None.
+            deadline: Seconds to wait for any response, or None.
+
+        Returns:
+            The first successful response.
+
+        Raises:
+            requests.exceptions.ReadTimeout: If nothing answered before the deadline.
+            Exception: The last transport error, if every attempt failed.
+        """
+        if hedge_after is None and deadline is None:
+            return self.send(request)
+        started = time.perf_counter()
+        pending = {self._start(request)}
+        hedged = hedge_after is None
+        error: BaseException | None = None
+        try:
+            while pending:
+                hedge_at = None if hedged else hedge_after
+                elapsed = time.perf_counter() - started
+                timeout = _wait_timeout(elapsed, hedge_at, deadline)
+                done, pending = wait(
+                    pending,
+                    timeout=timeout,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    error = future.exception()
+                    if error is None:
+                        return future.result()
+                if not done and hedge_at is not None and _before(hedge_at, deadline):
+                    hedged = True
+                    pending.add(self._start(request.copy()))
+                elif not done:
+                    break
+                elif not pending and not hedged:
+                    # The first attempt failed before a duplicate was sent.
+                    break
+        finally:
+            for future in pending:
+                future.cancel()
+        if error is not None and not pending:
+            raise error
+        raise _deadline_exceeded(request, deadline)
+
+    def submit(
+        self,
+        request: requests.PreparedRequest,
+        hedge_after: float | None = None,
+        deadline: float | None = None,
+    ) -> Future:
+        """Send a request in the background, if the transport is concurrent.
+
+        The serial transport sends the request before returning.
+
+        Args:
+            request: The prepared request.
+            hedge_after: Seconds to wait before sending a duplicate, or None.
+            deadline: Seconds to wait for any response, or None.
+
+        Returns:
+            A future for the response, see `send_hedged`.
+        """
+        future: Future = Future()
+        try:
+            future.set_result(self.send_hedged(request, hedge_after, deadline))
+        except Exception as ex:  # noqa: BLE001
+            future.set_exception(ex)
+        return future
+
+    def send_all(
+        self,
+        requests_: t.Sequence[requests.PreparedRequest],
+        hedge_after: float | None = None,
+        deadline: float | None = None,
+    ) -> list[_Result]:
+        """Send a batch of requests.
+
+        Transport errors are returned in place of the response, so a single
+        failed request can be retried by the caller without losing the others.
+
+        Args:
+            requests_: The prepared requests.
+            hedge_after: Seconds to wait before sending a duplicate, or None.
+            deadline: Seconds to wait for any response, or None.
+
+        Returns:
+            A response or exception per request, in request order.
+        """
+        futures = [self.submit(request, hedge_after, deadline) for request in requests_]
+        return [_result(future) for future in futures]
+
+    def close(self) -> None:
+        """Release resources held by the transport."""
+        with self._attempts_lock:
+            if self._attempts is not None:
+                self._attempts.shutdown(wait=False)
+                self._attempts = None
+
+    def _start(self, request: requests.PreparedRequest) -> Future:
+        # Bounded, so attempts abandoned after a stall cannot pile up threads
+        # and connections: room for an attempt and its duplicate per request.
+        # Locked, since the threaded transport starts attempts from its workers.
+        with self._attempts_lock:
+            if self._attempts is None:
+                self._attempts = ThreadPoolExecutor(
+                    max_workers=2 * self.max_concurrency,
+                )
+            return self._attempts.submit(self.send, request)
+
+
+class ThreadedTransport(SerialTransport):
+    """Send batches of requests from a pool of worker threads."""
+
+    concurrent = True
+
+    def __init__(
+        self,
+        session: requests.Session,
+        timeout: float,
+        max_concurrency: int = 1,
+    ) -> None:
+        """Create a new transport.
+
+        Args:
+            session: The session used to send requests.
+            timeout: The request timeout in seconds.
+            max_concurrency: The maximum number of requests in flight.
+        """
+        super().__init__(session, timeout, max_concurrency)
+        self._executor: ThreadPoolExecutor | None = None
+        self._futures: set[Future] = set()
+
+    def submit(
+        self,
+        request: requests.PreparedRequest,
+        hedge_after: float | None = None,
+        deadline: float | None = None,
+    ) -> Future:
+        """Send a request from a worker thread.
+
+        Args:
+            request: The prepared request.
+            hedge_after: Seconds to wait before sending a duplicate, or None.
+            deadline: Seconds to wait for any response, or None.
+
+        Returns:
+            A future for the response, see `send_hedged`.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        future = self._executor.submit(self.send_hedged, request, hedge_after, deadline)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return future
+
+    def close(self) -> None:
+        """Stop the worker threads, without waiting for requests in flight."""
+        if self._executor is not None:
+            # `shutdown(cancel_futures=True)` needs Python 3.9.
+            for future in list(self._futures):
+                future.cancel()
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        super().close()
+
+
+class AsyncioTransport(SerialTransport):
+    """Send requests with `httpx` from an event loop owned by the transport.
+
+    The event loop runs in a thread of its own until the transport is closed.
+    Responses are converted to `requests.Response` objects, so response
+    validation, pagination and parsing are shared with the other transports.
+    """
+
+    concurrent = True
+
+    def __init__(
+        self,
+        session: requests.Session,
+        timeout: float,
+        max_concurrency: int = 1,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        """Create a new transport.
+
+        Args:
+            session: The session used to send requests.
+            timeout: The request timeout in seconds.
+            max_concurrency: The maximum number of requests in flight.
+            transport: An optional `httpx` transport, e.g. for testing.
+
+        Raises:
+            ImportError: If `httpx` is not installed.
+        """
+        super().__init__(session, timeout, max_concurrency)
+        try:
+            import httpx
+        except ImportError as ex:  # pragma: no cover
+            msg = (
+                "The asyncio transport requires httpx, "
+                "install tap-jira with the 'asyncio' extra"
+            )
+            raise ImportError(msg) from ex
+
+        self._httpx = httpx
+        self._loop = asyncio.new_event_loop()
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            # Room for a hedged duplicate of every request in flight.
+            limits=httpx.Limits(max_connections=2 * self.max_concurrency),
+            transport=transport,
+        )
+        self._semaphore: asyncio.Semaphore | None = None
+        self._thread: threading.Thread | None = None
+
+    def send(self, request: requests.PreparedRequest) -> requests.Response:
+        """Send a single request.
+
+        Args:
+            request: The prepared request.
+
+        Returns:
+            The response.
+        """
+        return self.submit(request).result()
+
+    def send_hedged(
+        self,
+        request: requests.PreparedRequest,
+        hedge_after: float | None = None,
+        deadline: float | None = None,
+    ) -> requests.Response:
+        """Send an idempotent request, hedged and bounded by a deadline.
+
+        Like `SerialTransport.send_hedged`, except that attempts still in flight
+        are cancelled once a response is returned.
+
+        Args:
+            request: The prepared request, which must be safe to repeat.
+            hedge_after: Seconds to wait before sending a duplicate, or None.
+            deadline: Seconds to wait for any response, or None.
+
+        Returns:
+            The first successful response.
+        """
+        return self.submit(request, hedge_after, deadline).result()
+
+    def submit(
+        self,
+        request: requests.PreparedRequest,
+        hedge_after: float | None = None,
+        deadline: float | None = None,
+    ) -> Future:
+        """Send a request from the event loop.
+
+        Args:
+            request: The prepared request.
+            hedge_after: Seconds to wait before sending a duplicate, or None.
+            deadline: Seconds to wait for any response, or None.
+
+        Returns:
+            A future for the response, see `send_hedged`.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+            self._thread.start()
+        return asyncio.run_coroutine_threadsafe(
+            self._submit(request, hedge_after, deadline),
+            self._loop,
+        )
+
+    def close(self) -> None:
+        """Close the `httpx` client and stop the event loop."""
+        if self._loop.is_closed():
+            return
+        if self._thread is None:
+            self._loop.run_until_complete(self._client.aclose())
+        else:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+        self._loop.close()
+
+    async def _submit(
+        self,
+        request: requests.PreparedRequest,
+        hedge_after: float | None,
+        deadline: float | None,
+    ) -> requests.Response:
+        # Created on the event loop. Hedged duplicates do not take a slot, so
+        # they never wait for the request they are meant to overtake.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            result = await self._send_hedged(request, hedge_after, deadline)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def _send_hedged(
+        self,
+        request: requests.PreparedRequest,
+        hedge_after: float | None,
+        deadline: float | None,
+    ) -> _Result:
+        started = time.perf_counter()
+        pending = {asyncio.ensure_future(self._send_async(request))}
+        hedged = hedge_after is None
+        error: Exception | None = None
+        try:
+            while pending:
+                hedge_at = None if hedged else hedge_after
+                timeout = _wait_timeout(
+                    time.perf_counter() - started,
+                    hedge_at,
+                    deadline,
+                )
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    result = task.result()
+                    if not isinstance(result, Exception):
+                        return result
+                    error = result
+                if not done and hedge_at is not None and _before(hedge_at, deadline):
+                    hedged = True
+                    pending.add(asyncio.ensure_future(self._send_async(request)))
+                elif not done or (not pending and not hedged):
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        if error is not None and not pending:
+            return error
+        return _deadline_exceeded(request, deadline)
+
+    async def _send_async(self, request: requests.PreparedRequest) -> _Result:
+        httpx = self._httpx
+        started = time.perf_counter()
+        try:
+            response = await self._client.request(
+                request.method or "GET",
+                request.url or "",
+                headers=dict(request.headers),
+                content=request.body,
+            )
+        except httpx.TimeoutException as ex:
+            return requests.exceptions.ReadTimeout(str(ex), request=request)
+        except httpx.TransportError as ex:
+            return requests.exceptions.ConnectionError(str(ex), request=request)
+        elapsed = timedelta(seconds=time.perf_counter() - started)
+        return _to_requests_response(request, response, elapsed)
+
+
+def _wait_timeout(
+    elapsed: float,
+    hedge_after: float | None,
+    deadline: float | None,
+) -> float | None:
+    """Return how long to wait for the next hedging or deadline event."""
+    timeouts = [
+        max(limit - elapsed, 0)
+        for limit in (hedge_after, deadline)
+        if limit is not None
+    ]
+    return min(timeouts) if timeouts else None
+
+
+def _result(future: Future) -> _Result:
+    """Return the response of a future, or the transport error it failed with."""
+    error = future.exception()
+    if error is None:
+        return future.result()
+    if isinstance(error, requests.exceptions.RequestException):
+        return error
+    raise error
+
+
+def _before(seconds: float, deadline: float | None) -> bool:
+    return deadline is None or seconds < deadline
+
+
+def _deadline_exceeded(
+    request: requests.PreparedRequest,
+    deadline: float | None,
+) -> requests.exceptions.ReadTimeout:
+    msg = f"No response within the {deadline}s deadline for {request.url}"
+    return requests.exceptions.ReadTimeout(msg, request=request)
+
+
+def _to_requests_response(
+    request: requests.PreparedRequest,
+    response: httpx.Response,
+    elapsed: timedelta,
+) -> requests.Response:
+    result = requests.Response()
+    result.status_code = response.status_code
+    result.headers = CaseInsensitiveDict(response.headers)
+    result._content = response.content  # noqa: SLF001
+    result.encoding = response.encoding
+    result.reason = response.reason_phrase
+    result.url = str(response.url)
+    result.elapsed = elapsed
+    result.request = request
+    return result
+
+
+def get_transport(
+    name: str,
+    session: requests.Session,
+    timeout: float,
+    max_concurrency: int,
+) -> SerialTransport:
+    """Create the transport selected in the tap config.
+
+    Args:
+        name: One of ``serial``, ``threads`` or ``asyncio``.
+        session: The session used to send requests.
+        timeout: The request timeout in seconds.
+        max_concurrency: The maximum number of requests in flight.
+
+    Returns:
+        A transport instance.
+
+    Raises:
+        ValueError: If the transport name is unknown.
+    """
+    transports: dict[str, type[SerialTransport]] = {
+        "serial": SerialTransport,
+        "threads": ThreadedTransport,
+        "asyncio": AsyncioTransport,
+    }
+    if name not in transports:
+        msg = f"Unknown HTTP transport '{name}', expected one of {TRANSPORTS}"
+        raise ValueError(msg)
+    return transports[name](session, timeout, max_concurrency)
@@ -0,0 +1,253 @@
+"""Schema conformance and validation compiled once per stream schema."""
+
+from __future__ import annotations
+
+import typing as t
+
+from singer_sdk.helpers._typing import (
+    _conform_primitive_property,
+    is_boolean_type,
+    is_object_type,
+    is_uniform_list,
+)
+
+if t.TYPE_CHECKING:
+    import logging
+
+VALIDATION_MODES = ("none", "sample", "full")
+
+# Values decoded from JSON, which need no conversion unless they are booleans.
+_JSON_TYPES = (str, int, float, bool, type(None), dict, list)
+
+_Conform = t.Callable[[t.Any, t.List[str]], t.Any]
+
+
+def _conform_primitive(property_schema: dict) -> _Conform:
+    if is_boolean_type(property_schema):
+
+        def conform_boolean(
+            value: t.Any,  # noqa: ANN401
+            unmapped: list[str],  # noqa: ARG001
+        ) -> t.Any:  # noqa: ANN401
+            if isinstance(value, _JSON_TYPES):
+                return None if value is None else value != 0
+            return _conform_primitive_property(value, property_schema)
+
+        return conform_boolean
+
+    # Strings, numbers and anything else are passed on without walking into
+    # them, even if the API returned an object where the schema has a string.
+    def conform_value(
+        value: t.Any,  # noqa: ANN401
+        unmapped: list[str],  # noqa: ARG001
+    ) -> t.Any:  # noqa: ANN401
+        if isinstance(value, _JSON_TYPES):
+            return value
+        return _conform_primitive_property(value, property_schema)
+
+    return conform_value
+
+
+def _conform_object(schema: dict, path: str | None) -> _Conform:
+    # Property paths only depend on the schema, so they are built up front.
+    properties = {
+        name: _compile_property(
+            property_schema,
+            name if path is None else f"{path}.{name}",
+        )
+        for name, property_schema in schema["properties"].items()
+    }
+
+    def conform_object(value: t.Any, unmapped: list[str]) -> t.Any:  # noqa: ANN401
+        output = {}
+        for name, element in value.items():
+            conform = properties.get(name)
+            if conform is None:
+                unmapped.append(name if path is None else f"{path}.{name}")
+            else:
+                output[name] = conform(element, unmapped)
+        return output
+
+    return conform_object
+
+
+def _compile_property(property_schema: dict, path: str) -> _Conform:
+    conform_primitive = _conform_primitive(property_schema)
+
+    if is_uniform_list(property_schema):
+        item_schema = property_schema["items"]
+        conform_item: _Conform
+        if is_object_type(item_schema) and "properties" in item_schema:
+            conform_object = _conform_object(item_schema, path)
+            conform_primitive_item = _conform_primitive(item_schema)
+
+            def conform_item(item: t.Any, unmapped: list[str]) -> t.Any:  # noqa: ANN401
+                if isinstance(item, dict):
+                    return conform_object(item, unmapped)
+                return conform_primitive_item(item, unmapped)
+
+        else:
+            conform_item = _conform_primitive(item_schema)
+
+        def conform_list(value: t.Any, unmapped: list[str]) -> t.Any:  # noqa: ANN401
+            if isinstance(value, list):
+                return [conform_item(item, unmapped) for item in value]
+            return conform_primitive(value, unmapped)
+
+        return conform_list
+
+    if is_object_type(property_schema) and "properties" in property_schema:
+        conform_object = _conform_object(property_schema, path)
+
+        def conform_dict(value: t.Any, unmapped: list[str]) -> t.Any:  # noqa: ANN401
+            if isinstance(value, dict):
+                return conform_object(value, unmapped)
+            return conform_primitive(value, unmapped)
+
+        return conform_dict
+
+    return conform_primitive
+
+
+class RecordConformer:
+    """Conform records to a schema, like the SDK's recursive type conformance.
+
+    The schema is walked once to build a tree of conversion functions, instead
+    of inspecting the schema again for every property of every record.
+    """
+
+    def __init__(self, stream_name: str, schema: dict, logger: logging.Logger) -> None:
+        """Compile the schema.
+
+        Args:
+            stream_name: The stream name, for logging.
+            schema: The stream schema.
+            logger: The stream logger.
+        """
+        self.stream_name = stream_name
+        self.logger = logger
+        self._conform = _conform_object(schema, None)
+        self._reported: set[tuple[str, ...]] = set()
+
+    def conform(self, record: dict) -> dict:
+        """Return the record with the properties the schema does not define removed.
+
+        Args:
+            record: The record to conform.
+
+        Returns:
+            The conformed record.
+        """
+        unmapped: list[str] = []
+        output = self._conform(record, unmapped)
+        if unmapped and tuple(unmapped) not in self._reported:
+            self._reported.add(tuple(unmapped))
+            self.logger.warning(
+                "Properties %s were present in the '%s' stream but "
+                "not found in catalog schema. Ignoring.",
+                tuple(unmapped),
+                self.stream_name,
+            )
+        return output
+
+
+class RecordValidator:
+    """Validate records against a schema compiled once.
+
+    Uses `fastjsonschema` when it is installed, and `jsonschema` otherwise. In
+    ``sample`` mode only every Nth record is validated, until a record fails
+    validation, after which every record is.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        stream_name: str,
+        schema: dict,
+        logger: logging.Logger,
+        mode: str = "full",
+        sample_rate: int = 100,
+    ) -> None:
+        """Compile the schema.
+
+        Args:
+            stream_name: The stream name, for logging.
+            schema: The stream schema.
+            logger: The stream logger.
+            mode: One of ``none``, ``sample`` or ``full``.
+            sample_rate: Validate one in this many records in ``sample`` mode.
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in VALIDATION_MODES:
+            msg = (
+                f"Unknown validation mode '{mode}', expected one of {VALIDATION_MODES}"
+            )
+            raise ValueError(msg)
+        self.stream_name = stream_name
+        self.logger = logger
+        self.mode = mode
+        self.sample_rate = max(1, sample_rate)
+        self.invalid_count = 0
+        self._count = 0
+        self._errors = _compile_validator(schema) if mode != "none" else None
+
+    def validate(self, record: dict) -> bool:
+        """Validate a record, logging a warning if it is invalid.
+
+        Args:
+            record: The conformed record.
+
+        Returns:
+            False if the record was validated and found invalid.
+        """
+        if self._errors is None:
+            return True
+        self._count += 1
+        if self.mode == "sample" and (self._count - 1) % self.sample_rate:
+            return True
+
+        error = self._errors(record)
+        if error is None:
+            return True
+
+        self.invalid_count += 1
+        if self.mode == "sample":
+            self.logger.warning(
+                "Invalid record found in the '%s' stream, validating every record",
+                self.stream_name,
+            )
+            self.mode = "full"
+        self.logger.warning(
+            "Record in the '%s' stream does not match the schema: %s",
+            self.stream_name,
+            error,
+        )
+        return False
+
+
+def _compile_validator(schema: dict) -> t.Callable[[dict], str | None]:
+    """Return a function returning the first validation error of a record."""
+    try:
+        import fastjsonschema
+    except ImportError:
+        from jsonschema.validators import validator_for
+
+        validator = validator_for(schema)(schema)
+
+        def first_error(record: dict) -> str | None:
+            error = next(validator.iter_errors(record), None)
+            return None if error is None else error.message
+
+        return first_error
+
+    validate = fastjsonschema.compile(schema, use_formats=False)
+
+    def first_fast_error(record: dict) -> str | None:
+        try:
+            validate(record)
+        except fastjsonschema.JsonSchemaValueException as ex:
+            return ex.message
+        return None
+
+    return first_fast_error
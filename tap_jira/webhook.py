@@ -0,0 +1,269 @@
+"""A small Jira webhook receiver that spools issue-changed events to SQLite.
+
+Run it next to the tap with ``tap-jira-webhook --spool spool.db`` and register
+``http://<host>:<port>/`` as a Jira webhook for issue events. Set the tap's
+``webhook_spool`` setting to the same file to sync only the spooled issues.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import sqlite3
+import typing as t
+import uuid
+from contextlib import closing
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+#: Webhook events that carry the issue that changed.
+ISSUE_EVENT_PREFIXES = ("jira:issue_", "comment_", "worklog_", "issuelink_")
+
+
+class IssueSpool:
+    """A queue of changed issue ids, stored in SQLite.
+
+    Every event gets an increasing sequence number, which is never reused even
+    after old events are trimmed, and every spool gets a random id when it is
+    created. A reader that keeps both the spool id and the last sequence number
+    it consumed can therefore tell when it missed events.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Open the spool, creating it if needed.
+
+        Args:
+            path: The path of the SQLite database file.
+        """
+        self.path = str(path)
+        with closing(self._connect()) as connection, connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "issue_id TEXT NOT NULL, "
+                "event TEXT)",
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+            )
+            connection.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('spool_id', ?)",
+                (uuid.uuid4().hex,),
+            )
+            (self.spool_id,) = connection.execute(
+                "SELECT value FROM meta WHERE key = 'spool_id'",
+            ).fetchone()
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call, so the receiver can write from any thread.
+        return sqlite3.connect(self.path, timeout=30)
+
+    def append(self, issue_id: str, event: str | None = None) -> int:
+        """Add an event to the spool.
+
+        Args:
+            issue_id: The id of the issue that changed.
+            event: The webhook event name.
+
+        Returns:
+            The sequence number of the event.
+        """
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "INSERT INTO events (issue_id, event) VALUES (?, ?)",
+                (issue_id, event),
+            )
+            return t.cast(int, cursor.lastrowid)
+
+    def read(self, after: int = 0) -> list[tuple[int, str]]:
+        """Return the events after a sequence number.
+
+        Args:
+            after: The last sequence number already consumed.
+
+        Returns:
+            (sequence number, issue id) tuples, in sequence order.
+        """
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                "SELECT seq, issue_id FROM events WHERE seq > ? ORDER BY seq",
+                (after,),
+            ).fetchall()
+
+    def last_seq(self) -> int:
+        """Return the last sequence number handed out, or 0 for a new spool."""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'events'",
+            ).fetchone()
+        return row[0] if row else 0
+
+    def has_gap(self, cursor: int, spool_id: str | None) -> bool:
+        """Whether events after a sequence number may be missing from the spool.
+
+        That is the case when the cursor was read from another spool, e.g. one
+        that was deleted and recreated, or when events after the cursor were
+        trimmed.
+
+        Args:
+            cursor: The last sequence number consumed by the reader.
+            spool_id: The id of the spool the cursor was read from.
+
+        Returns:
+            True if the reader has to catch up some other way.
+        """
+        if spool_id != self.spool_id:
+            return True
+        with closing(self._connect()) as connection:
+            (first,) = connection.execute("SELECT MIN(seq) FROM events").fetchone()
+        if first is None:
+            return cursor < self.last_seq()
+        return first > cursor + 1
+
+    def trim(self, retain: int) -> None:
+        """Drop all but the most recent events.
+
+        Args:
+            retain: The number of events to keep, at least one.
+
+        Raises:
+            ValueError: If fewer than one event would be kept.
+        """
+        if retain < 1:
+            msg = f"At least one event must be retained, got {retain}"
+            raise ValueError(msg)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "DELETE FROM events WHERE seq <= "
+                "(SELECT seq FROM events ORDER BY seq DESC LIMIT 1 OFFSET ?)",
+                (retain,),
+            )
+
+
+def issue_id_from_payload(payload: dict) -> str | None:
+    """Return the id of the issue a webhook payload is about, if any.
+
+    Args:
+        payload: The decoded webhook body.
+
+    Returns:
+        The issue id, or None for events that are not about an issue.
+    """
+    event = payload.get("webhookEvent") or ""
+    if not event.startswith(ISSUE_EVENT_PREFIXES):
+        return None
+    issue = payload.get("issue") or {}
+    issue_id = issue.get("id")
+    return str(issue_id) if issue_id is not None else None
+
+
+def make_server(
+    spool: IssueSpool,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    secret: str | None = None,
+    retain: int | None = None,
+) -> ThreadingHTTPServer:
+    """Create an HTTP server that spools the issues of Jira webhook events.
+
+    Args:
+        spool: The spool to add events to.
+        host: The address to listen on.
+        port: The port to listen on, 0 for any free port.
+        secret: The webhook secret, to check the ``X-Hub-Signature`` header.
+        retain: The number of events to keep in the spool, or None for all.
+
+    Returns:
+        The server, call ``serve_forever()`` to start it.
+
+    Raises:
+        ValueError: If `retain` is below one.
+    """
+    if retain is not None and retain < 1:
+        msg = f"At least one event must be retained, got {retain}"
+        raise ValueError(msg)
+
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:  # noqa: N802
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if secret is not None:
+                expected = (
+                    "sha256="
+                    + hmac.new(
+                        secret.encode(),
+                        body,
+                        hashlib.sha256,
+                    ).hexdigest()
+                )
+                if not hmac.compare_digest(
+                    expected,
+                    self.headers.get("X-Hub-Signature", ""),
+                ):
+                    self.send_response(HTTPStatus.UNAUTHORIZED)
+                    self.end_headers()
+                    return
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_response(HTTPStatus.BAD_REQUEST)
+                self.end_headers()
+                return
+
+            issue_id = issue_id_from_payload(payload)
+            if issue_id is not None:
+                spool.append(issue_id, payload.get("webhookEvent"))
+                if retain is not None:
+                    spool.trim(retain)
+            self.send_response(HTTPStatus.NO_CONTENT)
+            self.end_headers()
+
+        def log_message(self, format: str, *args: t.Any) -> None:  # noqa: A002
+            logger.debug(format, *args)
+
+    return ThreadingHTTPServer((host, port), WebhookHandler)
+
+
+def main() -> None:
+    """Run the webhook receiver."""
+    parser = argparse.ArgumentParser(description="Spool Jira issue webhook events.")
+    parser.add_argument("--spool", required=True, help="SQLite spool file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--secret", help="The secret configured for the webhook")
+    parser.add_argument(
+        "--retain",
+        type=int,
+        help="Keep only this many events, the tap catches up with JQL after a gap",
+    )
+    args = parser.parse_args()
+    if args.retain is not None and args.retain < 1:
+        parser.error("--retain must be at least 1")
+
+    logging.basicConfig(level=logging.INFO)
+    server = make_server(
+        IssueSpool(args.spool),
+        host=args.host,
+        port=args.port,
+        secret=args.secret,
+        retain=args.retain,
+    )
+    logger.info("Spooling Jira webhook events to %s", args.spool)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
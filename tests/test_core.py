@@ -382,7 +382,8 @@ def test_standard_tap_tests(requests_mock) -> None:  # noqa: ANN001
         re.compile(r"/rest/api/3/status\?maxResults=100.*"),
         json=SPRINT_RESPONSE,
     )
-    requests_mock.get("/rest/api/3/users", json=USERS_RESPONSE)
+    requests_mock.get("/rest/api/3/users?maxResults=100", json=USERS_RESPONSE)
+    requests_mock.get("/rest/api/3/users?startAt=100", json=[])
     tests = get_standard_tap_tests(TapJira, config=SAMPLE_CONFIG)
     for test in tests:
         test()
@@ -0,0 +1,136 @@
+"""Tests for pagination and adaptive page sizing."""
+
+from __future__ import annotations
+
+import datetime
+import json
+import re
+
+import backoff
+import requests
+
+from tap_jira.paginators import JiraPaginator, OffsetPaginator, PageSizeController
+from tap_jira.tap import TapJira
+
+from .test_core import SAMPLE_CONFIG
+
+
+def make_response(
+    data: dict | list,
+    max_results: int = 100,
+    seconds: float = 0.1,
+) -> requests.Response:
+    """Build a response to a request for a page of the given size."""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(data).encode()  # noqa: SLF001
+    response.elapsed = datetime.timedelta(seconds=seconds)
+    response.request = requests.Request(
+        "GET",
+        "https://test.atlassian.net/rest/api/3/users",
+        params={"maxResults": max_results},
+    ).prepare()
+    return response
+
+
+def test_controller_grows_shrinks_and_respects_server_cap() -> None:
+    """The page size follows latency and never exceeds the server's maxResults."""
+    controller = PageSizeController(100, max_page_size=1000, target_latency=2)
+
+    controller.observe(make_response([], seconds=0.1))
+    assert controller.page_size == 200  # noqa: PLR2004
+
+    controller.observe(make_response([], max_results=200, seconds=3))
+    assert controller.page_size == 100  # noqa: PLR2004
+
+    controller.observe(make_response({"maxResults": 50}, max_results=100))
+    assert controller.page_size == 50  # noqa: PLR2004
+    controller.observe(make_response({"maxResults": 50}, max_results=50))
+    assert controller.page_size == 50  # noqa: PLR2004
+
+    controller.shrink()
+    assert controller.page_size == 25  # noqa: PLR2004
+
+
+def test_jira_paginator_uses_server_page_size() -> None:
+    """Offsets follow the maxResults Jira applied, not the one requested."""
+    paginator = JiraPaginator(start_value=0, page_size=100)
+
+    paginator.advance(make_response({"startAt": 0, "maxResults": 50, "total": 120}))
+    assert paginator.current_value == 50  # noqa: PLR2004
+
+    paginator.advance(make_response({"startAt": 50, "maxResults": 50, "isLast": True}))
+    assert paginator.finished
+
+
+def test_offset_paginator_continues_after_short_pages() -> None:
+    """Short pages advance by the requested page size, an empty page ends."""
+    paginator = OffsetPaginator(start_value=0, page_size=100)
+
+    paginator.advance(make_response([{"accountId": "a"}]))
+    assert paginator.current_value == 100  # noqa: PLR2004
+    assert not paginator.finished
+
+    paginator.advance(make_response([]))
+    assert paginator.finished
+
+
+def test_responses_are_decoded_once(monkeypatch) -> None:  # noqa: ANN001
+    """Pagination, page size control and parsing share one decoded body."""
+    response = make_response({"startAt": 0, "maxResults": 50, "total": 120})
+    decode = response.json
+    calls = []
+    monkeypatch.setattr(response, "json", lambda: calls.append(1) or decode())
+    paginator = JiraPaginator(
+        start_value=0,
+        page_size=100,
+        page_size_controller=PageSizeController(100),
+    )
+
+    paginator.advance(response)
+    assert paginator.get_remaining_values(response) == [50, 100]
+    assert len(calls) == 1
+
+
+def test_page_size_shrinks_before_retry(requests_mock) -> None:  # noqa: ANN001
+    """A page that failed with a server error is retried with a smaller size."""
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/10000/issue"),
+        [
+            {"status_code": 503},
+            {"json": {"startAt": 0, "maxResults": 50, "total": 0, "issues": []}},
+        ],
+    )
+    tap = TapJira(
+        config={**SAMPLE_CONFIG, "adaptive_page_size": True},
+        parse_env_config=False,
+    )
+    stream = tap.streams["issues"]
+    stream.backoff_wait_generator = lambda: backoff.constant(interval=0)
+
+    assert list(stream.get_records({"board_id": 10000})) == []
+    assert [request.qs["maxresults"] for request in requests_mock.request_history] == [
+        ["100"],
+        ["50"],
+    ]
+
+
+def test_users_page_size_is_capped(requests_mock) -> None:  # noqa: ANN001
+    """Users pages do not report a server cap, so they never grow past 100."""
+    pages = {0: [{"accountId": "a"}], 100: [{"accountId": "b"}]}
+    requests_mock.get(
+        re.compile(r"/rest/api/3/users"),
+        json=lambda request, _: pages.get(int(request.qs.get("startat", [0])[0]), []),
+    )
+    tap = TapJira(
+        config={**SAMPLE_CONFIG, "adaptive_page_size": True, "max_page_size": 1000},
+        parse_env_config=False,
+    )
+
+    records = list(tap.streams["users"].get_records(None))
+
+    assert [record["accountId"] for record in records] == ["a", "b"]
+    page_sizes = {
+        request.qs["maxresults"][0] for request in requests_mock.request_history
+    }
+    assert page_sizes == {"100"}
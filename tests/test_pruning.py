@@ -0,0 +1,74 @@
+"""Tests for pruning Jira boilerplate from records."""
+
+from __future__ import annotations
+
+import copy
+
+import pytest
+
+from tap_jira.pruning import RecordPruner
+from tap_jira.tap import TapJira
+
+from .test_core import ISSUE_RESPONSE, SAMPLE_CONFIG
+
+
+def test_default_paths_drop_boilerplate() -> None:
+    """Default rules drop links, avatars and colour metadata at any depth."""
+    record = {
+        "self": "https://example.org/1",
+        "id": "1",
+        "fields": {
+            "status": {
+                "iconUrl": "https://example.org/icon.png",
+                "name": "Open",
+                "statusCategory": {"id": 2, "colorName": "blue-gray"},
+            },
+            "assignee": {"avatarUrls": {"48x48": "x"}, "accountId": "a"},
+            "comment": [{"self": "https://example.org/c", "id": "c"}],
+        },
+    }
+
+    assert RecordPruner().prune(record) == {
+        "id": "1",
+        "fields": {
+            "status": {"name": "Open", "statusCategory": {"id": 2}},
+            "assignee": {"accountId": "a"},
+            "comment": [{"id": "c"}],
+        },
+    }
+
+
+def test_child_and_wildcard_steps() -> None:
+    """Child steps are anchored, wildcards match any property name."""
+    pruner = RecordPruner(["$.fields.*.id", "$.changelog.histories[*].author"])
+    record = {
+        "id": "1",
+        "fields": {"status": {"id": "3", "name": "Done"}, "id": "kept"},
+        "changelog": {"histories": [{"id": "h", "author": {"accountId": "a"}}]},
+    }
+
+    assert pruner.prune(record) == {
+        "id": "1",
+        "fields": {"status": {"name": "Done"}, "id": "kept"},
+        "changelog": {"histories": [{"id": "h"}]},
+    }
+
+
+@pytest.mark.parametrize("path", ["self", "$", "$.", "$.a[0]"])
+def test_invalid_paths(path: str) -> None:
+    """Unsupported paths are rejected when compiled."""
+    with pytest.raises(ValueError, match="Invalid prune path"):
+        RecordPruner([path])
+
+
+def test_issues_stream_prunes_before_emitting() -> None:
+    """The issues stream prunes records as part of post processing."""
+    tap = TapJira(config=SAMPLE_CONFIG, parse_env_config=False)
+    issue = copy.deepcopy(ISSUE_RESPONSE["issues"][0])
+
+    record = tap.streams["issues"].post_process(issue, {"board_id": 10000})
+
+    assert "self" not in record
+    assert "avatarUrls" not in record["fields"]["project"]
+    assert "self" not in record["fields"]["sprint"]
+    assert record["sprint_id"] == 10000  # noqa: PLR2004
@@ -0,0 +1,119 @@
+"""Tests for recording HTTP traffic and replaying it offline."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import re
+
+import pytest
+
+from tap_jira.recording import ReplayMissError, _load_archive
+from tap_jira.tap import TapJira
+
+from .test_core import (
+    BOARDS_RESPONSE,
+    ISSUE_RESPONSE,
+    SAMPLE_CONFIG,
+    SPRINT_RESPONSE,
+    STATUS_RESPONSE,
+    USERS_RESPONSE,
+)
+
+
+def mock_api(requests_mock) -> None:  # noqa: ANN001
+    """Mock the endpoints of all streams."""
+    requests_mock.get(re.compile(r"/rest/agile/1.0/board\?"), json=BOARDS_RESPONSE)
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/10000/issue"),
+        json=ISSUE_RESPONSE,
+    )
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/10000/sprint"),
+        json=SPRINT_RESPONSE,
+    )
+    requests_mock.get(re.compile(r"/rest/api/3/status"), json=STATUS_RESPONSE)
+    requests_mock.get("/rest/api/3/users?maxResults=100", json=USERS_RESPONSE)
+    requests_mock.get("/rest/api/3/users?startAt=100", json=[])
+
+
+def sync_records(config: dict, capsys) -> list[tuple[str, dict]]:  # noqa: ANN001
+    """Sync all streams and return the RECORD messages, without timestamps."""
+    capsys.readouterr()
+    TapJira(config=config, parse_env_config=False).sync_all()
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    return [
+        (message["stream"], message["record"])
+        for message in messages
+        if message["type"] == "RECORD"
+    ]
+
+
+def test_replay_serves_recorded_responses(
+    requests_mock,  # noqa: ANN001
+    capsys,  # noqa: ANN001
+    tmp_path,  # noqa: ANN001
+) -> None:
+    """A replayed sync emits the same records without sending any request."""
+    mock_api(requests_mock)
+    archive = tmp_path / "jira.jsonl.gz"
+    config = {**SAMPLE_CONFIG, "http_archive": str(archive)}
+
+    recorded = sync_records({**config, "http_archive_mode": "record"}, capsys)
+    request_count = requests_mock.call_count
+    assert recorded
+
+    with gzip.open(archive, "rt") as lines:
+        entries = [json.loads(line) for line in lines]
+    assert len(entries) == request_count
+    assert not any("Authorization" in json.dumps(entry) for entry in entries)
+
+    _load_archive.cache_clear()
+    replayed = sync_records({**config, "http_archive_mode": "replay"}, capsys)
+    assert replayed == recorded
+    assert requests_mock.call_count == request_count
+    assert _load_archive.cache_info().misses == 1
+
+
+def test_recording_redacts_pii(requests_mock, capsys, tmp_path) -> None:  # noqa: ANN001
+    """Personal data is replaced with stable pseudonyms."""
+    mock_api(requests_mock)
+    archive = tmp_path / "jira.jsonl.gz"
+    config = {
+        **SAMPLE_CONFIG,
+        "http_archive": str(archive),
+        "http_archive_redact_pii": True,
+    }
+    sync_records({**config, "http_archive_mode": "record"}, capsys)
+
+    users = [
+        record
+        for stream, record in sync_records(
+            {**config, "http_archive_mode": "replay"},
+            capsys,
+        )
+        if stream == "users"
+    ]
+    assert users
+    original = {user["accountId"]: user for user in USERS_RESPONSE}
+    for user in users:
+        assert user["displayName"] != original[user["accountId"]]["displayName"]
+        assert user["displayName"].startswith("redacted-")
+        if "emailAddress" in user:
+            assert user["emailAddress"].endswith("@example.invalid")
+
+
+def test_replay_fails_for_unrecorded_requests(tmp_path) -> None:  # noqa: ANN001
+    """Requests that were not recorded are not retried or sent."""
+    archive = tmp_path / "empty.jsonl.gz"
+    archive.write_bytes(gzip.compress(b""))
+    tap = TapJira(
+        config={
+            **SAMPLE_CONFIG,
+            "http_archive_mode": "replay",
+            "http_archive": str(archive),
+        },
+        parse_env_config=False,
+    )
+    with pytest.raises(ReplayMissError):
+        list(tap.streams["workflow_statuses"].get_records(None))
@@ -0,0 +1,401 @@
+"""Tests for stream specific behaviour."""
+
+from __future__ import annotations
+
+import copy
+import gzip
+import json
+import re
+from urllib.parse import urlparse
+
+from tap_jira.tap import TapJira
+
+from .test_core import ISSUE_RESPONSE, SAMPLE_CONFIG
+
+
+def test_issue_field_history_is_incremental(
+    requests_mock,  # noqa: ANN001
+    capsys,  # noqa: ANN001
+) -> None:
+    """Only changelog histories newer than the bookmark are flattened."""
+    issue = {
+        "id": "10002",
+        "key": "ED-1",
+        "changelog": {
+            "histories": [
+                {
+                    "id": "1",
+                    "created": "2021-01-10T10:00:00.000+0000",
+                    "items": [{"field": "status", "toString": "In Progress"}],
+                },
+                {
+                    "id": "2",
+                    "created": "2021-01-19T23:45:00.000+0000",
+                    "author": {"accountId": "5b10a2844c20165700ede21g"},
+                    "items": [
+                        {
+                            "field": "status",
+                            "fromString": "In Progress",
+                            "toString": "Done",
+                        },
+                        {"field": "resolution", "toString": "Fixed"},
+                    ],
+                },
+            ],
+        },
+        "fields": {"updated": "2021-01-19T23:45:00.000+0000", "sprint": None},
+    }
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/10000/issue"),
+        json={"startAt": 0, "maxResults": 100, "total": 1, "issues": [issue]},
+    )
+    tap = TapJira(
+        config={**SAMPLE_CONFIG, "start_date": "2021-01-15T00:00:00Z"},
+        parse_env_config=False,
+    )
+    tap.streams["issues"].sync({"board_id": 10000})
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    rows = [
+        message["record"]
+        for message in messages
+        if message["type"] == "RECORD" and message["stream"] == "issue_field_history"
+    ]
+    assert [(row["history_id"], row["field"], row["toString"]) for row in rows] == [
+        ("2", "status", "Done"),
+        ("2", "resolution", "Fixed"),
+    ]
+    assert rows[0]["author_account_id"] == "5b10a2844c20165700ede21g"
+
+
+def test_truncated_changelog_is_paged(requests_mock, capsys) -> None:  # noqa: ANN001
+    """Histories missing from the inline changelog are read from the endpoint."""
+
+    def history(history_id: int) -> dict:
+        return {
+            "id": str(history_id),
+            "created": "2021-01-19T23:45:00.000+0000",
+            "items": [{"field": "status", "toString": str(history_id)}],
+        }
+
+    def page(start: int, values: list[dict]) -> dict:
+        return {
+            "json": {"startAt": start, "maxResults": 2, "total": 3, "values": values},
+        }
+
+    issue = {
+        "id": "10002",
+        "key": "ED-1",
+        "changelog": {"total": 3, "histories": [history(1)]},
+        "fields": {"updated": "2021-01-19T23:45:00.000+0000", "sprint": None},
+    }
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/10000/issue"),
+        json={"startAt": 0, "maxResults": 100, "total": 1, "issues": [issue]},
+    )
+    changelog = requests_mock.get(
+        re.compile(r"/rest/api/3/issue/10002/changelog"),
+        [page(0, [history(1), history(2)]), page(2, [history(3)])],
+    )
+    tap = TapJira(
+        config={**SAMPLE_CONFIG, "start_date": "2021-01-15T00:00:00Z"},
+        parse_env_config=False,
+    )
+    tap.streams["issues"].sync({"board_id": 10000})
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    rows = [
+        message["record"]
+        for message in messages
+        if message["type"] == "RECORD" and message["stream"] == "issue_field_history"
+    ]
+    assert [row["toString"] for row in rows] == ["1", "2", "3"]
+    assert [request.qs.get("startat") for request in changelog.request_history] == [
+        None,
+        ["2"],
+    ]
+    assert "sort" not in changelog.request_history[0].qs
+
+
+def test_field_history_keys_are_unique(requests_mock, capsys) -> None:  # noqa: ANN001
+    """Items of one history that change the same field get distinct keys."""
+    issue = {
+        "id": "1",
+        "key": "ED-1",
+        "changelog": {
+            "histories": [
+                {
+                    "id": "2",
+                    "created": "2021-01-19T23:45:00.000+0000",
+                    "items": [
+                        {"field": "Attachment", "toString": "one.png"},
+                        {"field": "Attachment", "toString": "two.png"},
+                    ],
+                },
+            ],
+        },
+        "fields": {"updated": "2021-01-19T23:45:00.000+0000", "sprint": None},
+    }
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/10000/issue"),
+        json={"startAt": 0, "maxResults": 100, "total": 1, "issues": [issue]},
+    )
+    tap = TapJira(
+        config={**SAMPLE_CONFIG, "start_date": "2021-01-15T00:00:00Z"},
+        parse_env_config=False,
+    )
+    stream = tap.streams["issue_field_history"]
+    tap.streams["issues"].sync({"board_id": 10000})
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    keys = [
+        tuple(message["record"][key] for key in stream.primary_keys)
+        for message in messages
+        if message["type"] == "RECORD" and message["stream"] == stream.name
+    ]
+    assert keys == [("1", "2", 0), ("1", "2", 1)]
+
+
+def test_parents_are_hydrated_once(requests_mock) -> None:  # noqa: ANN001
+    """Unknown parents of a page are fetched in one bulk request and cached."""
+
+    def issue(issue_id: str, parent_key: str | None) -> dict:
+        parent = {"id": parent_key, "key": parent_key} if parent_key else None
+        return {
+            "id": issue_id,
+            "key": f"EX-{issue_id}",
+            "fields": {
+                "updated": "2021-01-19T23:45:00.000+0000",
+                "sprint": None,
+                "parent": parent,
+            },
+        }
+
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/1/issue"),
+        json={
+            "startAt": 0,
+            "maxResults": 100,
+            "total": 3,
+            "issues": [issue("1", "EP-1"), issue("2", "EP-1"), issue("3", "EP-2")],
+        },
+    )
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/2/issue"),
+        json={
+            "startAt": 0,
+            "maxResults": 100,
+            "total": 1,
+            "issues": [issue("4", "EP-1")],
+        },
+    )
+    bulkfetch = requests_mock.post(
+        "/rest/api/3/issue/bulkfetch",
+        json={
+            "issues": [
+                {
+                    "key": "EP-1",
+                    "self": "https://test.atlassian.net/rest/api/3/issue/EP-1",
+                    "fields": {"labels": ["epic"], "customfield_10001": "Team A"},
+                },
+            ],
+        },
+    )
+    tap = TapJira(
+        config={
+            **SAMPLE_CONFIG,
+            "hydrate_parents": True,
+            "custom_fields": {"customfield_10001": "team"},
+        },
+        parse_env_config=False,
+    )
+    stream = tap.streams["issues"]
+
+    records = [
+        *stream.get_records({"board_id": 1}),
+        *stream.get_records({"board_id": 2}),
+    ]
+
+    assert bulkfetch.call_count == 1
+    assert sorted(bulkfetch.last_request.json()["issueIdsOrKeys"]) == ["EP-1", "EP-2"]
+    assert [record["fields"]["parent"]["fields"] for record in records] == [
+        {"labels": ["epic"], "team": "Team A"},
+        {"labels": ["epic"], "team": "Team A"},
+        {},
+        {"labels": ["epic"], "team": "Team A"},
+    ]
+
+
+def test_issues_are_written_to_batch_files(
+    requests_mock,  # noqa: ANN001
+    capsys,  # noqa: ANN001
+    tmp_path,  # noqa: ANN001
+) -> None:
+    """Issues are written to gzip JSONL files announced with BATCH messages."""
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/10000/issue"),
+        json=ISSUE_RESPONSE,
+    )
+    tap = TapJira(
+        config={
+            **SAMPLE_CONFIG,
+            "batch_config": {
+                "encoding": {"format": "jsonl", "compression": "gzip"},
+                "storage": {"root": tmp_path.as_uri(), "prefix": "jira-"},
+                "batch_size": 1000,
+            },
+        },
+        parse_env_config=False,
+    )
+
+    tap.streams["issues"].sync({"board_id": 10000})
+    assert tap.streams["users"].get_batch_config(tap.config) is None
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert not [message for message in messages if message["type"] == "RECORD"]
+    (batch,) = (message for message in messages if message["type"] == "BATCH")
+    (path,) = tmp_path.glob("jira-*.json.gz")
+    assert batch["manifest"] == [path.as_uri()]
+    with gzip.open(path, "rt") as f:
+        (record,) = (json.loads(line) for line in f)
+    assert record["key"] == "ED-1"
+    assert record["sprint_id"] == 10000  # noqa: PLR2004
+    assert "sprint" not in record["fields"]
+
+
+def test_issue_batches_are_written_per_board(
+    requests_mock,  # noqa: ANN001
+    capsys,  # noqa: ANN001
+    tmp_path,  # noqa: ANN001
+) -> None:
+    """Each board gets its own files, announced before its bookmark is emitted."""
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board\?"),
+        json={"isLast": True, "values": [{"id": 1}, {"id": 2}]},
+    )
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/\d+/sprint"),
+        json={"isLast": True, "values": []},
+    )
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/\d+/issue"),
+        json=lambda request, _: {
+            **ISSUE_RESPONSE,
+            "issues": [
+                {**issue, "key": request.path.split("/")[-2]}
+                for issue in ISSUE_RESPONSE["issues"]
+            ],
+        },
+    )
+    tap = TapJira(
+        config={
+            **SAMPLE_CONFIG,
+            "batch_config": {
+                "encoding": {"format": "jsonl", "compression": "gzip"},
+                "storage": {"root": tmp_path.as_uri(), "prefix": "jira-"},
+                "batch_size": 1000,
+            },
+        },
+        parse_env_config=False,
+    )
+
+    tap.streams["boards"].sync()
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    batched_keys = []
+    for message in messages:
+        if message["type"] == "BATCH":
+            (uri,) = message["manifest"]
+            with gzip.open(urlparse(uri).path, "rt") as f:
+                batched_keys.append([json.loads(line)["key"] for line in f])
+        if message["type"] == "STATE":
+            bookmarks = message["value"].get("bookmarks", {})
+            partitions = bookmarks.get("issues", {}).get("partitions", [])
+            synced = [partition["context"]["board_id"] for partition in partitions]
+            assert len(synced) <= len(batched_keys)
+    assert batched_keys == [["1"], ["2"]]
+
+
+def test_planner_skips_idle_boards(requests_mock, capsys) -> None:  # noqa: ANN001
+    """Boards are probed, idle boards skipped and the rest synced largest first."""
+    totals = {1: 0, 2: 3, 3: 40}
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board\?"),
+        json={"isLast": True, "values": [{"id": board_id} for board_id in totals]},
+    )
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/\d+/sprint"),
+        json={"isLast": True, "values": []},
+    )
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/\d+/issue"),
+        json=lambda request, _: {
+            "startAt": 0,
+            "maxResults": int(request.qs["maxresults"][0]),
+            "total": totals[int(request.path.split("/")[-2])],
+            "issues": [],
+        },
+    )
+    tap = TapJira(
+        config={**SAMPLE_CONFIG, "plan_issue_sync": True, "http_transport": "threads"},
+        parse_env_config=False,
+    )
+    tap.streams["boards"].sync()
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    boards = [
+        message["record"]["id"]
+        for message in messages
+        if message["type"] == "RECORD" and message["stream"] == "boards"
+    ]
+    assert boards == [3, 2, 1]
+    issue_requests = [
+        (request.path.split("/")[-2], request.qs["maxresults"][0])
+        for request in requests_mock.request_history
+        if request.path.endswith("/issue")
+    ]
+    assert sorted(issue_requests) == [
+        ("1", "0"),
+        ("2", "0"),
+        ("2", "100"),
+        ("3", "0"),
+        ("3", "100"),
+    ]
+
+
+def test_users_are_emitted_when_new_or_changed(requests_mock) -> None:  # noqa: ANN001
+    """Short pages do not end the sync, and unchanged users are not emitted again."""
+    pages = {
+        0: [{"accountId": "a", "displayName": "Ann"}, {"accountId": "b"}],
+        100: [{"accountId": "c", "displayName": "Cas"}],
+        200: [],
+        300: [{"accountId": "ignored"}],
+    }
+    requests_mock.get(
+        re.compile(r"/rest/api/3/users"),
+        json=lambda request, _: pages.get(int(request.qs.get("startat", [0])[0]), []),
+    )
+    config = {
+        **SAMPLE_CONFIG,
+        "incremental_users": True,
+        "http_transport": "threads",
+        "max_concurrent_requests": 2,
+    }
+
+    state: dict = {}
+
+    def sync_users() -> list[str]:
+        tap = TapJira(config=config, state=copy.deepcopy(state), parse_env_config=False)
+        records = tap.streams["users"].get_records(None)
+        emitted = [record["accountId"] for record in records]
+        state.update(tap.state)
+        return emitted
+
+    assert sync_users() == ["a", "b", "c"]
+    assert len(state["bookmarks"]["users"]["user_hashes"]) == 32  # noqa: PLR2004
+    assert sync_users() == []
+
+    pages[100] = [{"accountId": "c", "displayName": "Cas", "active": False}]
+    pages[200] = [{"accountId": "d"}]
+    pages[300] = []
+    assert sync_users() == ["c", "d"]
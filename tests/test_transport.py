@@ -0,0 +1,431 @@
+"""Tests for the concurrent HTTP transports."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import backoff
+import httpx
+import pytest
+import requests
+
+from tap_jira.tap import TapJira
+from tap_jira.transport import (
+    AsyncioTransport,
+    LatencyTracker,
+    SerialTransport,
+    ThreadedTransport,
+)
+
+from .test_core import SAMPLE_CONFIG
+
+TOTAL_ISSUES = 250
+
+
+def issues_page(start_at: int, total: int = TOTAL_ISSUES, page_size: int = 100) -> dict:
+    """Return a page of issues starting at the given offset."""
+    count = min(page_size, total - start_at)
+    return {
+        "startAt": start_at,
+        "maxResults": page_size,
+        "total": total,
+        "issues": [
+            {
+                "id": str(start_at + i),
+                "key": f"EX-{start_at + i}",
+                "fields": {"updated": "2021-01-19T23:45:00.000+0000", "sprint": None},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def test_threaded_transport_fans_out_pages(requests_mock) -> None:  # noqa: ANN001
+    """Remaining pages are requested in one batch and emitted in page order."""
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/10000/issue"),
+        json=lambda request, _: issues_page(int(request.qs.get("startat", [0])[0])),
+    )
+    tap = TapJira(
+        config={**SAMPLE_CONFIG, "http_transport": "threads"},
+        parse_env_config=False,
+    )
+    records = list(tap.streams["issues"].get_records({"board_id": 10000}))
+
+    assert [record["id"] for record in records] == [str(i) for i in range(TOTAL_ISSUES)]
+    assert requests_mock.call_count == 3  # noqa: PLR2004
+
+
+def test_prefetch_window_is_bounded(requests_mock) -> None:  # noqa: ANN001
+    """Only `max_concurrent_requests` pages are held ahead of the page parsed."""
+    total = 2000
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/10000/issue"),
+        json=lambda request, _: issues_page(
+            int(request.qs.get("startat", [0])[0]),
+            total,
+        ),
+    )
+    tap = TapJira(
+        config={
+            **SAMPLE_CONFIG,
+            "http_transport": "threads",
+            "max_concurrent_requests": 3,
+        },
+        parse_env_config=False,
+    )
+    stream = tap.streams["issues"]
+
+    held = []
+    records = []
+    for record in stream.get_records({"board_id": 10000}):
+        held.append(len(stream._prefetched))  # noqa: SLF001
+        records.append(record)
+
+    assert len(records) == total
+    assert max(held) == 3  # noqa: PLR2004
+    assert requests_mock.call_count == total // 100
+    assert stream._prefetched == {}  # noqa: SLF001
+
+
+def test_prefetched_pages_keep_the_served_page_size(
+    requests_mock,  # noqa: ANN001
+) -> None:
+    """Pages are not skipped or fetched twice when the page size grows."""
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/10000/issue"),
+        json=lambda request, _: issues_page(
+            int(request.qs.get("startat", [0])[0]),
+            1000,
+            int(request.qs["maxresults"][0]),
+        ),
+    )
+    tap = TapJira(
+        config={
+            **SAMPLE_CONFIG,
+            "http_transport": "threads",
+            "adaptive_page_size": True,
+        },
+        parse_env_config=False,
+    )
+    records = list(tap.streams["issues"].get_records({"board_id": 10000}))
+
+    assert [record["id"] for record in records] == [str(i) for i in range(1000)]
+    assert sorted(
+        (int(request.qs.get("startat", [0])[0]), request.qs["maxresults"][0])
+        for request in requests_mock.request_history
+    ) == [(start_at, "100") for start_at in range(0, 1000, 100)]
+
+
+def test_prefetched_page_is_retried_smaller(requests_mock) -> None:  # noqa: ANN001
+    """A prefetched page that failed is retried with the reduced page size."""
+    failed: list[int] = []
+
+    def page(request, context) -> dict:  # noqa: ANN001
+        start_at = int(request.qs.get("startat", [0])[0])
+        if start_at == 200 and not failed:  # noqa: PLR2004
+            failed.append(start_at)
+            context.status_code = 503
+            return {}
+        return issues_page(start_at, 400, int(request.qs["maxresults"][0]))
+
+    requests_mock.get(re.compile(r"/rest/agile/1.0/board/10000/issue"), json=page)
+    tap = TapJira(
+        config={
+            **SAMPLE_CONFIG,
+            "http_transport": "threads",
+            "adaptive_page_size": True,
+            "max_page_size": 100,
+        },
+        parse_env_config=False,
+    )
+    stream = tap.streams["issues"]
+    stream.backoff_wait_generator = lambda: backoff.constant(interval=0)
+    records = list(stream.get_records({"board_id": 10000}))
+
+    assert [record["id"] for record in records] == [str(i) for i in range(400)]
+    retries = [
+        (request.qs["startat"][0], request.qs["maxresults"][0])
+        for request in requests_mock.request_history
+        if request.qs.get("startat") == ["200"]
+    ]
+    assert retries == [("200", "100"), ("200", "50")]
+
+
+def mock_boards(requests_mock, boards: list[int]) -> None:  # noqa: ANN001
+    """Mock boards that have a single page of issues and no sprints."""
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board\?"),
+        json={"isLast": True, "values": [{"id": board_id} for board_id in boards]},
+    )
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/\d+/sprint"),
+        json={"isLast": True, "values": []},
+    )
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/\d+/issue"),
+        json=lambda request, _: issues_page(0, 10, int(request.qs["maxresults"][0])),
+    )
+
+
+def test_child_prefetch_survives_page_size_changes(
+    requests_mock,  # noqa: ANN001
+) -> None:
+    """The first issue page of every board is requested once."""
+    boards = [1, 2, 3, 4, 5]
+    mock_boards(requests_mock, boards)
+    tap = TapJira(
+        config={
+            **SAMPLE_CONFIG,
+            "http_transport": "threads",
+            "adaptive_page_size": True,
+        },
+        parse_env_config=False,
+    )
+    tap.streams["boards"].sync()
+
+    issue_requests = [
+        request.path
+        for request in requests_mock.request_history
+        if request.path.endswith("/issue")
+    ]
+    assert len(issue_requests) == len(boards)
+
+
+@pytest.mark.parametrize("fail_once", [False, True])
+def test_asyncio_transport_fans_out_pages(fail_once: bool) -> None:  # noqa: FBT001
+    """The asyncio transport serves pages in order and failures are retried."""
+    calls: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = parse_qs(urlparse(str(request.url)).query)
+        start_at = int(query.get("startAt", [0])[0])
+        calls.append(start_at)
+        failing = start_at == 200  # noqa: PLR2004
+        if fail_once and failing and calls.count(start_at) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json=issues_page(start_at))
+
+    tap = TapJira(
+        config={**SAMPLE_CONFIG, "http_transport": "asyncio"},
+        parse_env_config=False,
+    )
+    stream = tap.streams["issues"]
+    stream._transport = AsyncioTransport(  # noqa: SLF001
+        stream.requests_session,
+        timeout=10,
+        max_concurrency=4,
+        transport=httpx.MockTransport(handler),
+    )
+    stream.backoff_wait_generator = lambda: backoff.constant(interval=0)
+
+    records = list(stream.get_records({"board_id": 10000}))
+    stream.transport.close()
+
+    assert [record["id"] for record in records] == [str(i) for i in range(TOTAL_ISSUES)]
+    assert sorted(calls) == ([0, 100, 200, 200] if fail_once else [0, 100, 200])
+
+
+def test_latency_tracker_reports_percentile() -> None:
+    """The percentile is only reported once there are enough samples."""
+    tracker = LatencyTracker(percentile=90, window=10, min_samples=5)
+    for latency in (5.0, 1.0, 2.0, 3.0):
+        tracker.observe(latency)
+    assert tracker.threshold() is None
+
+    for latency in range(1, 11):
+        tracker.observe(float(latency))
+    assert tracker.threshold() == 9.0  # noqa: PLR2004
+
+
+class SlowFirstTransport(SerialTransport):
+    """Transport that answers the first request late.
+
+    The delay is added here, since `requests_mock` sends one request at a time.
+    """
+
+    def __init__(self, *args, delay: float, **kwargs) -> None:  # noqa: ANN002, ANN003
+        """Create a transport that delays the first request by `delay` seconds."""
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+        self.calls = 0
+
+    def send(self, request: requests.PreparedRequest) -> requests.Response:
+        """Send a request, late if it is the first one."""
+        self.calls += 1
+        if self.calls == 1:
+            time.sleep(self.delay)
+        return super().send(request)
+
+
+class SlowFirstThreadedTransport(SlowFirstTransport, ThreadedTransport):
+    """Threaded transport that answers the first request late."""
+
+
+def slow_issues_stream(  # noqa: ANN201
+    requests_mock,  # noqa: ANN001
+    config: dict,
+    delay: float,
+    transport: type[SerialTransport] = SlowFirstTransport,
+):
+    """Return an issues stream whose first request is answered late."""
+    requests_mock.get(
+        re.compile(r"/rest/agile/1.0/board/10000/issue"),
+        json=issues_page(TOTAL_ISSUES - 10),
+    )
+    tap = TapJira(config={**SAMPLE_CONFIG, **config}, parse_env_config=False)
+    stream = tap.streams["issues"]
+    stream._transport = transport(  # noqa: SLF001
+        stream.requests_session,
+        timeout=10,
+        delay=delay,
+    )
+    stream.backoff_wait_generator = lambda: backoff.constant(interval=0)
+    stream.backoff_jitter = lambda value: value
+    return stream
+
+
+def test_slow_request_is_hedged(requests_mock) -> None:  # noqa: ANN001
+    """A duplicate is sent once a request is slower than the tracked percentile."""
+    stream = slow_issues_stream(requests_mock, {"hedge_requests": True}, delay=2)
+    for _ in range(stream.latency_tracker.min_samples):
+        stream.latency_tracker.observe(0.05)
+
+    started = time.perf_counter()
+    records = list(stream.get_records({"board_id": 10000}))
+
+    assert time.perf_counter() - started < 1
+    assert len(records) == 10  # noqa: PLR2004
+    assert stream.transport.calls == 2  # noqa: PLR2004
+
+
+def test_request_deadline_is_retried(requests_mock) -> None:  # noqa: ANN001
+    """A request that misses the stream deadline is abandoned and retried."""
+    stream = slow_issues_stream(
+        requests_mock,
+        {"request_deadlines": {"issues": 0.1}},
+        delay=1,
+    )
+
+    started = time.perf_counter()
+    records = list(stream.get_records({"board_id": 10000}))
+
+    assert time.perf_counter() - started < 1
+    assert len(records) == 10  # noqa: PLR2004
+    assert stream.transport.calls == 2  # noqa: PLR2004
+
+
+def test_asyncio_transport_hedges_and_cancels() -> None:
+    """The asyncio transport returns the duplicate and enforces the deadline."""
+    calls: list[int] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:  # noqa: ARG001
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+        return httpx.Response(200, json={"values": []})
+
+    transport = AsyncioTransport(
+        requests.Session(),
+        timeout=10,
+        transport=httpx.MockTransport(handler),
+    )
+    request = requests.Request("GET", "https://example.org/board").prepare()
+
+    started = time.perf_counter()
+    response = transport.send_hedged(request, hedge_after=0.05)
+    assert response.json() == {"values": []}
+    assert time.perf_counter() - started < 1
+
+    calls.clear()
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        transport.send_hedged(request, deadline=0.05)
+    transport.close()
+
+
+def test_prefetch_deadline_is_retried(requests_mock) -> None:  # noqa: ANN001
+    """A prefetched page that misses the deadline is requested again."""
+    stream = slow_issues_stream(
+        requests_mock,
+        {"request_deadlines": {"issues": 0.1}},
+        delay=1,
+        transport=SlowFirstThreadedTransport,
+    )
+
+    started = time.perf_counter()
+    stream.prefetch([{"board_id": 10000}])
+    records = list(stream.get_records({"board_id": 10000}))
+
+    assert time.perf_counter() - started < 1
+    assert len(records) == 10  # noqa: PLR2004
+    assert stream.transport.calls == 2  # noqa: PLR2004
+
+
+def test_transports_are_closed_after_sync(
+    requests_mock,  # noqa: ANN001
+    monkeypatch,  # noqa: ANN001
+) -> None:
+    """The transports of a stream and its children are closed after its sync."""
+    closed: list[SerialTransport] = []
+    monkeypatch.setattr(ThreadedTransport, "close", lambda self: closed.append(self))
+    mock_boards(requests_mock, [1, 2])
+    tap = TapJira(
+        config={**SAMPLE_CONFIG, "http_transport": "threads"},
+        parse_env_config=False,
+    )
+    streams = [tap.streams[name] for name in ("boards", "sprints", "issues")]
+
+    streams[0].sync()
+
+    assert len(closed) == len(streams)
+    assert all(stream._transport is None for stream in streams)  # noqa: SLF001
+
+
+class StalledSession(requests.Session):
+    """Session whose requests hang until they are released."""
+
+    def __init__(self) -> None:
+        """Create a session with no requests sent yet."""
+        super().__init__()
+        self.release = threading.Event()
+        self.sent = 0
+
+    def send(self, request, **kwargs):  # noqa: ANN001, ANN003, ANN201, ARG002
+        """Wait until the session is released, then return an empty response."""
+        self.sent += 1
+        self.release.wait(5)
+        return requests.Response()
+
+
+def test_threaded_transport_close_cancels_queued_requests() -> None:
+    """Closing the threaded transport cancels requests still waiting for a worker."""
+    session = StalledSession()
+    transport = ThreadedTransport(session, timeout=10, max_concurrency=1)
+    request = requests.Request("GET", "https://example.org/board").prepare()
+    running = transport.submit(request)
+    queued = transport.submit(request)
+
+    transport.close()
+    session.release.set()
+
+    assert queued.cancelled()
+    assert running.result(timeout=5).status_code is None
+
+
+def test_abandoned_attempts_are_bounded() -> None:
+    """Attempts that miss their deadline do not start a thread each."""
+    session = StalledSession()
+    transport = SerialTransport(session, timeout=10)
+    request = requests.Request("GET", "https://example.org/board").prepare()
+
+    for _ in range(5):
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            transport.send_hedged(request, hedge_after=0.01, deadline=0.05)
+    transport.close()
+    session.release.set()
+
+    assert session.sent == 2  # noqa: PLR2004
@@ -0,0 +1,66 @@
+"""Tests for compiled schema conformance and record validation."""
+
+from __future__ import annotations
+
+import copy
+import logging
+
+from singer_sdk.helpers._typing import TypeConformanceLevel, conform_record_data_types
+
+from tap_jira.tap import TapJira
+from tap_jira.validation import RecordConformer, RecordValidator
+
+from .test_core import ISSUE_RESPONSE, SAMPLE_CONFIG, USERS_RESPONSE
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_conformer_matches_sdk_conformance() -> None:
+    """The compiled conformer gives the same records as the SDK."""
+    tap = TapJira(config=SAMPLE_CONFIG, parse_env_config=False)
+    for stream_name, records in [
+        ("issues", ISSUE_RESPONSE["issues"]),
+        ("users", USERS_RESPONSE),
+    ]:
+        schema = tap.streams[stream_name].schema
+        conformer = RecordConformer(stream_name, schema, LOGGER)
+        for record in records:
+            expected = conform_record_data_types(
+                stream_name=stream_name,
+                record=copy.deepcopy(record),
+                schema=schema,
+                level=TypeConformanceLevel.RECURSIVE,
+                logger=LOGGER,
+            )
+            assert conformer.conform(copy.deepcopy(record)) == expected
+
+
+def test_conformer_does_not_walk_string_properties() -> None:
+    """Values of string properties are passed on as is, whatever their type."""
+    schema = {
+        "properties": {
+            "team": {"type": ["string", "null"]},
+            "active": {"type": ["boolean", "null"]},
+        },
+    }
+    conformer = RecordConformer("test", schema, LOGGER)
+
+    assert conformer.conform({"team": {"id": 1}, "active": 0, "other": 1}) == {
+        "team": {"id": 1},
+        "active": False,
+    }
+
+
+def test_sample_mode_validates_every_record_after_a_failure(
+    caplog,  # noqa: ANN001
+) -> None:
+    """Only every Nth record is validated until one is invalid."""
+    schema = {"properties": {"id": {"type": "string"}}}
+    validator = RecordValidator("test", schema, LOGGER, mode="sample", sample_rate=3)
+
+    results = [validator.validate({"id": value}) for value in ["1", 2, 3, 4, "5", 6]]
+
+    assert results == [True, True, True, False, True, False]
+    assert validator.mode == "full"
+    assert validator.invalid_count == 2  # noqa: PLR2004
+    assert "validating every record" in caplog.text
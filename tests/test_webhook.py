@@ -0,0 +1,162 @@
+"""Tests for the webhook receiver and the spooled issues stream."""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import re
+import threading
+import urllib.error
+import urllib.request
+from http import HTTPStatus
+
+import pytest
+
+from tap_jira.tap import TapJira
+from tap_jira.webhook import IssueSpool, make_server
+
+from .test_core import SAMPLE_CONFIG
+
+
+def issue(issue_id: str) -> dict:
+    """Return an issue as returned by the search and bulk fetch endpoints."""
+    return {
+        "id": issue_id,
+        "key": f"EX-{issue_id}",
+        "fields": {
+            "updated": "2021-01-19T23:45:00.000+0000",
+            "customfield_10001": "Team A",
+        },
+    }
+
+
+@pytest.fixture()
+def receiver(tmp_path):  # noqa: ANN001, ANN201
+    """Run a local webhook receiver, yielding its spool and a function to post."""
+    spool = IssueSpool(tmp_path / "spool.db")
+    server = make_server(spool, port=0, secret="s3cret", retain=3)  # noqa: S106
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def post(payload: dict, secret: str = "s3cret") -> int:  # noqa: S107
+        body = json.dumps(payload).encode()
+        signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{server.server_port}/",
+            data=body,
+            headers={"X-Hub-Signature": f"sha256={signature}"},
+        )
+        try:
+            with urllib.request.urlopen(request) as response:  # noqa: S310
+                return response.status
+        except urllib.error.HTTPError as ex:
+            return ex.code
+
+    yield spool, post
+    server.shutdown()
+    server.server_close()
+
+
+def issue_event(issue_id: str) -> dict:
+    """Return a Jira issue updated webhook payload."""
+    return {"webhookEvent": "jira:issue_updated", "issue": {"id": issue_id}}
+
+
+def test_receiver_spools_issue_events(receiver) -> None:  # noqa: ANN001
+    """Only signed issue events are spooled, and old events are trimmed."""
+    spool, post = receiver
+
+    project_event = {"webhookEvent": "project_created", "project": {"id": "1"}}
+    assert post(issue_event("1")) == HTTPStatus.NO_CONTENT
+    assert post(project_event) == HTTPStatus.NO_CONTENT
+    unsigned = post(issue_event("2"), secret="wrong")  # noqa: S106
+    assert unsigned == HTTPStatus.UNAUTHORIZED
+    assert spool.read() == [(1, "1")]
+
+    for issue_id in ("2", "3", "4"):
+        post(issue_event(issue_id))
+    assert spool.read() == [(2, "2"), (3, "3"), (4, "4")]
+    assert spool.has_gap(0, spool.spool_id)
+    assert not spool.has_gap(1, spool.spool_id)
+
+
+def test_recreated_spool_is_a_gap(tmp_path) -> None:  # noqa: ANN001
+    """A cursor from a deleted spool is a gap, even once the new one is longer."""
+    path = tmp_path / "spool.db"
+    spool = IssueSpool(path)
+    spool.append("1")
+    old_id = spool.spool_id
+    path.unlink()
+
+    spool = IssueSpool(path)
+    spool.append("2")
+    spool.append("3")
+
+    assert spool.spool_id != old_id
+    assert spool.has_gap(1, old_id)
+    assert not spool.has_gap(1, spool.spool_id)
+    assert IssueSpool(path).spool_id == spool.spool_id
+
+
+def test_spool_keeps_at_least_one_event(tmp_path) -> None:  # noqa: ANN001
+    """Trimming every event, including unread ones, is rejected."""
+    spool = IssueSpool(tmp_path / "spool.db")
+    with pytest.raises(ValueError, match="At least one event"):
+        spool.trim(0)
+    with pytest.raises(ValueError, match="At least one event"):
+        make_server(spool, port=0, retain=0)
+
+
+def test_spooled_issues_are_fetched_in_bulk(
+    receiver,  # noqa: ANN001
+    requests_mock,  # noqa: ANN001
+    tmp_path,  # noqa: ANN001
+) -> None:
+    """The first sync catches up with JQL, later syncs only fetch spooled issues."""
+    spool, post = receiver
+    search = requests_mock.get(
+        re.compile(r"/rest/api/3/search"),
+        json={"startAt": 0, "maxResults": 100, "total": 1, "issues": [issue("1")]},
+    )
+    bulk_fetch = requests_mock.post(
+        re.compile(r"/rest/api/3/issue/bulkfetch"),
+        json=lambda request, _: {
+            "issues": [
+                issue(issue_id) for issue_id in request.json()["issueIdsOrKeys"]
+            ],
+        },
+    )
+    config = {
+        **SAMPLE_CONFIG,
+        "webhook_spool": str(tmp_path / "spool.db"),
+        "custom_fields": {"customfield_10001": "team"},
+    }
+
+    post(issue_event("1"))
+    tap = TapJira(config=config, parse_env_config=False)
+    stream = tap.streams["issues"]
+    assert stream.parent_stream_type is None
+    assert tap.streams["issue_field_history"] in stream.child_streams
+    assert [record["id"] for record in stream.get_records(None)] == ["1"]
+    assert search.call_count == 1
+    assert bulk_fetch.call_count == 0
+
+    post(issue_event("2"))
+    post(issue_event("3"))
+    post(issue_event("2"))
+    records = list(stream.get_records(None))
+    assert [record["id"] for record in records] == ["2", "3"]
+    assert records[0]["fields"]["team"] == "Team A"
+    assert records[0]["sprint_id"] is None
+    assert bulk_fetch.last_request.json()["expand"] == ["changelog"]
+    assert search.call_count == 1
+
+    # Events 5 to 8 arrive between syncs, the receiver only keeps 6 to 8.
+    for issue_id in ("4", "5", "6", "7"):
+        post(issue_event(issue_id))
+    list(stream.get_records(None))
+    assert search.call_count == 2  # noqa: PLR2004
+    state = stream.get_context_state(None)
+    assert state["spool_cursor"] == spool.last_seq()
+    assert state["spool_id"] == spool.spool_id